@@ -0,0 +1,312 @@
+# api_server.py
+import asyncio
+import bisect
+import json
+import threading
+import time
+from datetime import date, datetime
+from typing import Callable, Dict, Tuple
+from urllib.parse import parse_qs, urlsplit
+from utils import log_debug_event
+
+TK_TIMEOUT_SECS = 5  # a request waiting longer than this for the Tk thread gets a 503 and is dropped
+MAX_BODY_BYTES = 64 * 1024
+LOCAL_HOSTS = ("127.0.0.1", "localhost", "[::1]")
+
+REASONS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 415: "Unsupported Media Type", 503: "Service Unavailable"}
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class ApiServer:
+    """Local HTTP/JSON API so editor plugins and shell hooks can log time without the popup.
+
+        GET  /status                             active project, since when, today's total
+        GET  /today                              today's seconds per project
+        GET  /summary?start=YYYY-MM-DD&end=...   seconds per day and project over a date range
+        POST /switch   {"project": "name"}       same as clicking the project's button
+
+    The server runs its own asyncio loop on a background thread. Anything that touches sessions runs
+    on the Tk thread, handed over with root.after() (which tkinter passes to the Tcl thread when
+    called from another one), so it is serialized with the GUI's own reads and writes.
+    Reads are answered from two snapshots taken on the Tk thread: today's totals (advanced to the
+    current time for the active project) and the closed totals of every day, sorted by date so a
+    range is summed here with bisect. A snapshot is only taken again once the repository's version
+    moves on or it is refresh_secs old, and concurrent requests share one fetch, so any number
+    of readers cost the Tk loop at most one short call per change.
+    """
+
+    def __init__(self, root, today: Callable[[], dict], history: Callable[[], dict], switch: Callable[[str], dict],
+                 version: Callable[[], int], host: str = "127.0.0.1", port: int = 8765, refresh_secs: float = 5.0):
+        self.root = root
+        self.calls = {"today": today, "history": history, "switch": switch}
+        self.version = version
+        self.host = host
+        self.port = port
+        self.refresh_secs = refresh_secs
+        self.loop = None
+        self.thread = None
+        self.error = None  # why the server did not start, if it didn't
+        self.stats = {"requests": 0, "snapshot_hits": 0, "tk_calls": 0, "tk_timeouts": 0, "errors": 0}
+        self._snapshots: Dict[str, Tuple[dict, float]] = {}  # name -> (snapshot, monotonic time fetched)
+        self._in_flight: Dict[Tuple, asyncio.Future] = {}  # key -> shared Tk call (loop thread only)
+        self._stopping = None
+        self._connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}  # open connections
+        self._started = threading.Event()
+
+    # === Lifecycle (Tk thread) ===
+
+    def start(self) -> bool:
+        # Returns False (and logs why) if the server could not listen
+        if not self.root.tk.getboolean(self.root.tk.eval("expr {[info exists tcl_platform(threaded)] && $tcl_platform(threaded)}")):
+            self.error = "Tcl is not built with threads"
+        else:
+            self.thread = threading.Thread(target=self._run, name="api-server", daemon=True)
+            self.thread.start()
+            self._started.wait(5)
+        if self.error:
+            log_debug_event("API server not started: %s", self.error)
+            return False
+        log_debug_event("API server listening on http://%s:%d", self.host, self.port)
+        return True
+
+    def stop(self, timeout: float = 2.0):
+        if self.loop is not None and self.thread.is_alive():
+            self.loop.call_soon_threadsafe(self._stopping.set)
+            self.thread.join(timeout)
+        log_debug_event("API server: %s", self.stats)
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self._main())
+        except OSError as e:
+            self.error = str(e)
+        finally:
+            self._started.set()
+            self.loop.close()
+
+    async def _main(self):
+        self._stopping = asyncio.Event()
+        server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]  # the one picked, if port was 0
+        self._started.set()
+        async with server:
+            await self._stopping.wait()
+            for writer in self._connections.values():
+                writer.close()  # idle keep-alive clients would otherwise hold up the shutdown
+            await asyncio.gather(*self._connections, return_exceptions=True)
+
+    # === HTTP ===
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # One connection; HTTP/1.1 keep-alive, so a client can reuse it for many requests
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = line.decode("latin-1").split()
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "malformed request"}, keep_alive=False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "request body too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                status, payload = await self._handle(method, target, headers, body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: dict, keep_alive: bool):
+        body = json.dumps(payload).encode()
+        writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                     .encode("latin-1") + body)
+        await writer.drain()
+
+    async def _handle(self, method: str, target: str, headers: dict, body: bytes) -> Tuple[int, dict]:
+        self.stats["requests"] += 1
+        url = urlsplit(target)
+        try:
+            # Pages in a browser can reach localhost too: refuse other host names (DNS rebinding)
+            # and form posts, which can't carry a JSON content type without a CORS preflight
+            host = headers.get("host", "").lower()
+            if (host if host.endswith("]") else host.rsplit(":", 1)[0]) not in LOCAL_HOSTS:
+                raise ApiError(403, "only local clients are served")
+            routes = {("GET", "/status"): self._status, ("GET", "/today"): self._today,
+                      ("GET", "/summary"): self._summary, ("POST", "/switch"): self._switch}
+            route = routes.get((method, url.path))
+            if route is None:
+                paths = {path for _, path in routes}
+                raise ApiError(405 if url.path in paths else 404, f"no route for {method} {url.path}")
+            if method == "POST":
+                if headers.get("content-type", "").split(";")[0].strip() != "application/json":
+                    raise ApiError(415, "send the request body as application/json")
+                try:
+                    args = json.loads(body or b"{}")
+                except ValueError:
+                    raise ApiError(400, "request body is not valid JSON")
+                if not isinstance(args, dict):
+                    raise ApiError(400, "request body must be a JSON object")
+            else:
+                args = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            return 200, await route(args)
+        except ApiError as e:
+            self.stats["errors"] += 1
+            return e.status, {"error": str(e)}
+
+    # === Endpoints ===
+
+    async def _status(self, args: dict) -> dict:
+        snap, now = await self._current()
+        since = snap["since"]
+        return {
+            "project": snap["project"],
+            "since": since.isoformat(timespec="seconds") if since else None,
+            "elapsed": round((now - since).total_seconds(), 3) if since else 0,
+            "today_total": round(sum(self._advance(snap, now).values()), 3),
+        }
+
+    async def _today(self, args: dict) -> dict:
+        snap, now = await self._current()
+        totals = self._advance(snap, now)
+        return {"date": now.date().isoformat(), "projects": {p: round(s, 3) for p, s in totals.items()},
+                "total": round(sum(totals.values()), 3)}
+
+    async def _summary(self, args: dict) -> dict:
+        try:
+            start = date.fromisoformat(args.get("start") or date.today().isoformat())
+            end = date.fromisoformat(args.get("end") or start.isoformat())
+        except ValueError:
+            raise ApiError(400, "start and end must be dates as YYYY-MM-DD")
+        if end < start:
+            raise ApiError(400, "end is before start")
+        history = await self._latest("history")
+        snap, now = await self._current()
+        lo, hi = bisect.bisect_left(history["days"], start), bisect.bisect_right(history["days"], end)
+        days = {day: dict(totals) for day, totals in zip(history["days"][lo:hi], history["totals"][lo:hi])}
+        if snap["project"] is not None and start <= snap["since"].date() <= end:
+            # As in the summary window, the active session counts on the day it started
+            per_day = days.setdefault(snap["since"].date(), {})
+            per_day[snap["project"]] = per_day.get(snap["project"], 0) + (now - snap["since"]).total_seconds()
+
+        projects = {}
+        for per_day in days.values():
+            for project, seconds in per_day.items():
+                projects[project] = projects.get(project, 0) + seconds
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "days": {day.isoformat(): {p: round(s, 3) for p, s in days[day].items()} for day in sorted(days)},
+            "projects": {p: round(s, 3) for p, s in projects.items()},
+            "total": round(sum(projects.values()), 3),
+        }
+
+    async def _switch(self, args: dict) -> dict:
+        project = args.get("project")
+        if not isinstance(project, str) or not project:
+            raise ApiError(400, 'send {"project": "<name>"}')
+        return await self._on_tk("switch", project)
+
+    # === Snapshot and Tk hand-over ===
+
+    async def _current(self) -> Tuple[dict, datetime]:
+        # Today's snapshot and the time to carry it on to
+        snap = await self._latest("today")
+        return snap, max(datetime.now(), snap["taken"])
+
+    async def _latest(self, name: str) -> dict:
+        # The named snapshot, taken again on the Tk thread only if it may be out of date
+        snap, fetched = self._snapshots.get(name, (None, 0.0))
+        if (snap is None or snap["version"] != self.version() or snap["taken"].date() != date.today()
+                or time.monotonic() - fetched > self.refresh_secs):
+            return await self._shared((name,), lambda: self._fetch(name))
+        self.stats["snapshot_hits"] += 1
+        return snap
+
+    async def _fetch(self, name: str) -> dict:
+        fetched = time.monotonic()
+        snap = await self._on_tk(name)
+        self._snapshots[name] = (snap, fetched)
+        return snap
+
+    @staticmethod
+    def _advance(snap: dict, now: datetime) -> Dict[str, float]:
+        # The snapshot's totals with the active session carried on to now
+        totals = dict(snap["totals"])
+        if snap["project"] is not None:
+            totals[snap["project"]] = totals.get(snap["project"], 0) + max(0.0, (now - snap["taken"]).total_seconds())
+        return totals
+
+    async def _shared(self, key: Tuple, fetch: Callable) -> dict:
+        # Concurrent requests for the same thing wait on one fetch
+        future = self._in_flight.get(key)
+        if future is None:
+            future = self._in_flight[key] = asyncio.ensure_future(fetch())
+            future.add_done_callback(lambda f: self._in_flight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def _on_tk(self, name: str, *args) -> dict:
+        # Runs calls[name](*args) on the Tk thread and waits for its result. Whichever side takes
+        # claim first decides: the Tk thread runs the call, or a timeout withdraws it, so a request
+        # that gets a 503 is never applied later.
+        loop = asyncio.get_running_loop()
+        result = loop.create_future()
+        claim = threading.Lock()
+
+        def settle(value, error):
+            if not result.done():
+                result.set_exception(error) if error else result.set_result(value)
+
+        def call():
+            if not claim.acquire(blocking=False):
+                return  # timed out before the Tk thread got to it
+            try:
+                value, error = self.calls[name](*args), None
+            except ApiError as e:
+                value, error = None, e
+            except Exception as e:
+                log_debug_event("API %s failed: %s", name, e)
+                value, error = None, ApiError(503, f"{name} failed: {e}")
+            try:
+                loop.call_soon_threadsafe(settle, value, error)
+            except RuntimeError:
+                pass  # the server stopped while the call ran
+
+        self.stats["tk_calls"] += 1
+        try:
+            # after() blocks until the Tcl thread takes the call, so it is made off the event loop
+            await loop.run_in_executor(None, self.root.after, 0, call)
+        except Exception:  # RuntimeError or TclError: the Tk main loop is not running
+            raise ApiError(503, "the app is shutting down")
+        try:
+            return await asyncio.wait_for(asyncio.shield(result), TK_TIMEOUT_SECS)
+        except asyncio.TimeoutError:
+            if claim.acquire(blocking=False):
+                self.stats["tk_timeouts"] += 1
+                raise ApiError(503, "the app is busy, try again")
+        return await result  # the Tk thread started the call just as the wait ran out
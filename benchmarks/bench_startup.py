@@ -0,0 +1,104 @@
+# bench_startup.py
+"""Startup-time benchmark: fresh interpreter -> gui imported -> first popup drawn.
+
+Each run is a separate Python process pointed at a throwaway data folder holding a
+synthetic session log, so results don't depend on (or touch) the real session data.
+
+    python benchmarks/bench_startup.py --runs 10 --days 1000 --max-ms 1500
+
+Prints one JSON object with the median and min of each phase; exits non-zero if the
+median time to first popup exceeds --max-ms. Without a display only the import phase
+is measured.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from generate_log import write_log, write_projects  # noqa: E402
+
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {repo!r})
+import config
+config.SESSION_FILE = {session_file!r}
+config.SESSION_DIR = {session_dir!r}
+config.CONFIG_FILE = {config_file!r}
+config.CATALOG_FILE = {catalog_file!r}
+config.DEBUG_LOG_FILE = {debug_file!r}
+import gui
+t_import = time.perf_counter()
+result = {{"import_ms": (t_import - t0) * 1000, "heavy_modules": sorted(m for m in ("pandas", "numpy") if m in sys.modules)}}
+try:
+    root = gui.get_root()
+except Exception as e:  # no display
+    result["error"] = str(e)
+else:
+    t_root = time.perf_counter()
+    gui.show_popup(gui.load_projects())
+    root.update()
+    t_popup = time.perf_counter()
+    result["root_ms"] = (t_root - t_import) * 1000
+    result["first_popup_ms"] = (t_popup - t0) * 1000
+    root.destroy()
+print(json.dumps(result))
+"""
+
+
+def write_data(data_dir, days):
+    write_log(os.path.join(data_dir, "sessionLog.csv"), years=days / 365.25)
+    write_projects(os.path.join(data_dir, "projectConfig.csv"), 8)
+
+
+def run_once(data_dir):
+    code = CHILD.format(
+        repo=REPO_DIR,
+        session_file=os.path.join(data_dir, "sessionLog.csv"),
+        session_dir=os.path.join(data_dir, "sessions"),
+        config_file=os.path.join(data_dir, "projectConfig.csv"),
+        catalog_file=os.path.join(data_dir, "projectCatalog.csv"),
+        debug_file=os.path.join(data_dir, "debug_logfile.txt"),
+    )
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - t0) * 1000
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--days", type=int, default=365, help="days of synthetic history in the session log")
+    parser.add_argument("--max-ms", type=float, default=None, help="fail if median first_popup_ms exceeds this")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_data(data_dir, args.days)
+        run_once(data_dir)  # warm the OS file cache, partition the log and build the sidecars
+        runs = [run_once(data_dir) for _ in range(args.runs)]
+
+    summary = {"runs": args.runs, "days": args.days, "heavy_modules": runs[-1]["heavy_modules"]}
+    for phase in ("import_ms", "root_ms", "first_popup_ms", "process_ms"):
+        values = [r[phase] for r in runs if phase in r]
+        if values:
+            summary[phase] = {"median": round(statistics.median(values), 2), "min": round(min(values), 2)}
+    if "error" in runs[-1]:
+        summary["error"] = runs[-1]["error"]
+    print(json.dumps(summary, indent=2))
+
+    if args.max_ms is not None and "first_popup_ms" in summary and summary["first_popup_ms"]["median"] > args.max_ms:
+        sys.exit(f"first popup median {summary['first_popup_ms']['median']}ms exceeds {args.max_ms}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+# bench_storage.py
+"""Headless storage and aggregation benchmark on a synthetic multi-year session log.
+
+    python benchmarks/bench_storage.py --years 5 --repeat 5 --out after.json --compare before.json
+
+Covers load_sessions (full history and one day), save_sessions append throughput,
+overwrite_sessions, compute_totals, the View Summary pivot, SessionIndex range queries and
+whole-history totals from the binary log against parsing the same history from text.
+Everything runs against a throwaway data folder, so the real session data is never read or
+touched, and no Tk is needed. Prints one JSON object (also written to --out); with --compare each result gets
+the ratio of its median to the same benchmark in an earlier results file.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import config  # noqa: E402
+from generate_log import add_arguments, log_options, write_log, write_projects  # noqa: E402
+
+
+def point_config_at(data_dir, backend, partition):
+    config.SESSION_FILE = os.path.join(data_dir, "sessionLog.csv")
+    config.SESSION_DIR = os.path.join(data_dir, "sessions")
+    config.SQLITE_FILE = os.path.join(data_dir, "timesheet.db")
+    config.BINARY_LOG_FILE = os.path.join(data_dir, "sessionLog.bin")
+    config.CONFIG_FILE = os.path.join(data_dir, "projectConfig.csv")
+    config.CATALOG_FILE = os.path.join(data_dir, "projectCatalog.csv")
+    config.DEBUG_LOG_FILE = os.path.join(data_dir, "debug_logfile.txt")
+    config.METRICS_FILE = os.path.join(data_dir, "metrics.json")
+    config.DEBUG_LOG_LEVEL = "WARNING"  # keep the debug log out of the timings
+    config.STORAGE_BACKEND = backend
+    config.SESSION_PARTITION = partition
+
+
+def measure(fn, repeat, rows=None):
+    """Runs fn repeat times; rows defaults to the length of what fn returns."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    if rows is None:
+        rows = len(result)
+    median = statistics.median(times)
+    return {
+        "median_ms": round(median * 1000, 3),
+        "min_ms": round(min(times) * 1000, 3),
+        "rows": rows,
+        "rows_per_s": round(rows / median) if median else None,
+    }
+
+
+def traced_bytes(fn) -> int:
+    # Memory still held by fn's result
+    tracemalloc.start()
+    result = fn()  # noqa: F841 (kept alive until measured)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+
+def sessions_daily_totals(sessions):
+    # The per-(day, project) group-by as done over a list of Session objects
+    totals = {}
+    for s in sessions:
+        if s.duration:
+            key = (s.start_time.date(), s.project)
+            totals[key] = totals.get(key, 0) + s.duration
+    return totals
+
+
+def scan_range_totals(sessions, start, end):
+    # Seconds per project between start and end, clipping the sessions at either edge, by a linear scan
+    totals = {}
+    for s in sessions:
+        if s.duration and s.duration > 0:
+            seconds = (min(s.start_time + timedelta(seconds=s.duration), end) - max(s.start_time, start)).total_seconds()
+            if seconds > 0:
+                totals[s.project] = totals.get(s.project, 0) + seconds
+    return totals
+
+
+def run_benchmarks(args):
+    import storage
+    from models import Session
+    from tracker import compute_totals, summary_pivot
+    from session_index import SessionIndex
+    from session_repository import SessionRepository
+
+    results = {}
+    storage.set_backend(None)
+
+    t0 = time.perf_counter()
+    all_sessions = storage.load_sessions()  # first use migrates/partitions the log and builds the sidecars
+    results["first_load"] = {"median_ms": round((time.perf_counter() - t0) * 1000, 3), "rows": len(all_sessions)}
+
+    sample_day = all_sessions[-1].start_time.date()  # most recent logged day
+    day_sessions = storage.load_sessions(for_date=sample_day)
+
+    results["load_sessions_full"] = measure(storage.load_sessions, args.repeat)
+    results["load_sessions_for_date"] = measure(lambda: storage.load_sessions(for_date=sample_day), args.repeat)
+    results["load_daily_totals"] = measure(storage.load_daily_totals, args.repeat)
+    results["compute_totals_day"] = measure(lambda: compute_totals(day_sessions), args.repeat, rows=len(day_sessions))
+    results["compute_totals_full"] = measure(lambda: compute_totals(all_sessions), args.repeat, rows=len(all_sessions))
+
+    totals = storage.load_daily_totals()
+    results["summary_pivot"] = measure(lambda: summary_pivot(totals), args.repeat, rows=len(totals))
+
+    # Columnar SessionTable against the list of Session objects it replaces
+    table = storage.load_session_table()
+    results["load_session_table"] = measure(storage.load_session_table, args.repeat)
+    results["sessions_daily_totals"] = measure(lambda: sessions_daily_totals(all_sessions), args.repeat, rows=len(all_sessions))
+    results["table_daily_totals"] = measure(table.daily_totals, args.repeat, rows=len(table))
+    results["table_pivot"] = measure(table.pivot, args.repeat, rows=len(table))
+    results["bytes_per_session"] = {
+        "sessions": round(traced_bytes(storage.load_sessions) / len(all_sessions), 1),
+        "table": round(traced_bytes(storage.load_session_table) / len(table), 1),
+    }
+
+    # Time-range queries: SessionIndex bisects where the list of sessions is scanned
+    index = SessionIndex(all_sessions)
+    window_end = all_sessions[-1].start_time
+    window_start = window_end - timedelta(hours=4)
+    results["index_build"] = measure(lambda: SessionIndex(all_sessions), args.repeat, rows=len(all_sessions))
+    results["index_range_totals"] = measure(lambda: index.totals(window_start, window_end), args.repeat)
+    results["scan_range_totals"] = measure(lambda: scan_range_totals(all_sessions, window_start, window_end), args.repeat, rows=len(all_sessions))
+    results["index_point_lookup"] = measure(lambda: index.at(window_start), args.repeat, rows=1)
+
+    # The whole-history aggregate parsed from text rows against the mmapped binary log. With the
+    # binary backend selected both sides read the same file, so only the second is meaningful.
+    from binary_storage import BinaryStorage
+    binary = BinaryStorage(os.path.join(os.path.dirname(config.SESSION_FILE), "compare.bin"), config.CONFIG_FILE)
+    binary.migrate_from(storage.get_backend())
+    results["parse_daily_totals"] = measure(lambda: sessions_daily_totals(storage.get_backend().iter_sessions()),
+                                            args.repeat, rows=len(all_sessions))
+    results["binary_daily_totals"] = measure(binary.load_daily_totals, args.repeat, rows=len(all_sessions))
+    results["binary_load_table"] = measure(binary.load_table, args.repeat)
+
+    # Cached reads, as the GUI makes them: one stat per file unless the log changed on disk
+    repo = SessionRepository()
+    repo.sessions(sample_day, sample_day)
+    repo.daily_totals()
+    results["repository_day_cached"] = measure(lambda: repo.sessions(sample_day, sample_day), args.repeat)
+    results["repository_daily_totals_cached"] = measure(repo.daily_totals, args.repeat)
+
+    # Rewrites the same content, so every repeat sees an identical log
+    results["overwrite_sessions"] = measure(lambda: storage.overwrite_sessions(all_sessions), args.repeat, rows=len(all_sessions))
+
+    # Last, since it grows the log: one save per project switch, as the GUI does
+    clock = [datetime.combine(date.today(), datetime.min.time()) + timedelta(hours=20)]
+
+    def append_batch():
+        for _ in range(args.appends):
+            clock[0] += timedelta(seconds=1)
+            storage.save_sessions([Session("Project 1", clock[0], 1.0)])
+
+    results["save_sessions_append"] = measure(append_batch, args.repeat, rows=args.appends)
+    return results
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    for name, result in results.items():
+        before = baseline.get(name, {}).get("median_ms")
+        if before and "median_ms" in result:
+            result["vs_baseline"] = round(result["median_ms"] / before, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    parser.add_argument("--backend", choices=("csv", "sqlite", "binary"), default="csv")
+    parser.add_argument("--partition", choices=("month", "week", "none"), default="month")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--appends", type=int, default=100, help="single-session saves per append repeat")
+    parser.add_argument("--out", help="also write the results JSON here")
+    parser.add_argument("--compare", help="earlier results JSON to compare medians against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        point_config_at(data_dir, args.backend, None if args.partition == "none" else args.partition)
+        rows = write_log(config.SESSION_FILE, **log_options(args))
+        write_projects(config.CONFIG_FILE, args.projects)
+        results = run_benchmarks(args)
+
+    if args.compare:
+        compare(results, args.compare)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": args.backend,
+            "partition": args.partition,
+            "log_rows": rows,
+            "repeat": args.repeat,
+            **log_options(args),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# generate_log.py
+"""Writes a synthetic, realistic sessionLog.csv for benchmarks.
+
+    python benchmarks/generate_log.py out/sessionLog.csv --years 3 --projects 8 --sessions-per-day 12
+
+Weekdays only, roughly 09:00-17:30 with a lunch Break; the day's sessions are back to
+back like real project switches. --adjustment-rate is the chance that a day gets a
+manual adjustment (a -N/+N pair sharing one Start, as Edit Log writes them).
+Output is seeded, so the same arguments always give the same file.
+"""
+import argparse
+import csv
+import os
+import random
+from datetime import date, datetime, time, timedelta
+
+DAY_START = time(9, 0)
+DAY_SECONDS = 8.5 * 3600
+
+
+def project_names(count):
+    return [f"Project {i + 1}" for i in range(count)] + ["Break"]
+
+
+def generate_rows(years=3, projects=8, sessions_per_day=12, adjustment_rate=0.05, end=None, seed=1):
+    """Yields (project, start_iso, duration) rows oldest first, ending on `end` (default today)."""
+    rng = random.Random(seed)
+    names = project_names(projects)
+    end = end or date.today()
+    day = end - timedelta(days=round(365.25 * years) - 1)
+    while day <= end:
+        if day.weekday() < 5:
+            yield from _day_rows(rng, names, day, sessions_per_day, adjustment_rate)
+        day += timedelta(days=1)
+
+
+def _day_rows(rng, names, day, sessions_per_day, adjustment_rate):
+    count = max(1, round(rng.gauss(sessions_per_day, sessions_per_day / 4)))
+    # Random cut points split the working day into back-to-back sessions
+    cuts = sorted(rng.uniform(0, DAY_SECONDS) for _ in range(count - 1))
+    bounds = [0.0] + cuts + [DAY_SECONDS]
+    lunch = rng.randrange(count)
+    start_of_day = datetime.combine(day, DAY_START) + timedelta(seconds=rng.randint(-1800, 1800))
+    logged = []
+    for i in range(count):
+        project = "Break" if i == lunch else rng.choice(names[:-1])
+        start = start_of_day + timedelta(seconds=round(bounds[i]))
+        duration = round(bounds[i + 1] - bounds[i], 3)
+        logged.append(project)
+        yield project, start.isoformat(), duration
+
+    if rng.random() < adjustment_rate:
+        from_project = rng.choice(logged)
+        to_project = rng.choice([p for p in names if p != from_project])
+        amount = float(rng.choice((300, 900, 1800, 3600)))
+        stamp = datetime.combine(day, time(17, 45)).isoformat()
+        yield from_project, stamp, -amount
+        yield to_project, stamp, amount
+
+
+def write_log(path, **options):
+    """Writes generate_rows(**options) to path with the app's header; returns the row count."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    count = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Project", "Start", "Duration"])
+        for row in generate_rows(**options):
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def write_projects(path, projects):
+    with open(path, "w", newline="") as f:
+        f.write("\n".join(project_names(projects)))
+
+
+def add_arguments(parser):
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--projects", type=int, default=8, help="projects besides Break")
+    parser.add_argument("--sessions-per-day", type=int, default=12)
+    parser.add_argument("--adjustment-rate", type=float, default=0.05, help="chance a day has an adjustment")
+    parser.add_argument("--seed", type=int, default=1)
+
+
+def log_options(args):
+    return dict(years=args.years, projects=args.projects, sessions_per_day=args.sessions_per_day,
+                adjustment_rate=args.adjustment_rate, seed=args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="session log to write")
+    parser.add_argument("--config-file", help="also write a matching projectConfig.csv here")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    rows = write_log(args.path, **log_options(args))
+    if args.config_file:
+        write_projects(args.config_file, args.projects)
+    print(f"Wrote {rows} rows to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
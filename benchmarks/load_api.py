@@ -0,0 +1,216 @@
+# load_api.py
+"""Load test for the local HTTP API (api_server.py): many clients at once on keep-alive connections.
+
+    python benchmarks/load_api.py --standalone --clients 50 --duration 10
+    python benchmarks/load_api.py --port 8765 --clients 20 --mix status=3,today=1
+
+--standalone starts the app's API in a child process on a Tcl event loop (no window needed)
+against a throwaway data folder with a synthetic history, and also reports how late that
+loop's after() callbacks ran while under load. Without it the running app on --port is used;
+switch is then left out unless --mix asks for it and --switch-to names the projects, as
+it logs time. Prints one JSON object (also written to --out) with the request rate and
+latency percentiles per endpoint.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import config  # noqa: E402
+from bench_storage import point_config_at  # noqa: E402
+from generate_log import add_arguments, log_options, project_names, write_log, write_projects  # noqa: E402
+
+LAG_TICK_SECS = 0.01
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def latency_ms(values):
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 3) if values else None,
+        "p95_ms": round(percentile(values, 95) * 1000, 3) if values else None,
+        "p99_ms": round(percentile(values, 99) * 1000, 3) if values else None,
+        "max_ms": round(max(values) * 1000, 3) if values else None,
+    }
+
+
+# === The app side (--serve, run as the child process of --standalone) ===
+
+def serve(args):
+    # Runs the app's API on a Tcl event loop until stdin closes, then prints its stats
+    point_config_at(args.serve, args.backend, "month")
+    config.JOURNAL_FILE = os.path.join(args.serve, "activeSession.journal")
+    config.API_PORT = 0
+    import tkinter
+    import gui
+
+    root = gui.root = tkinter.Tcl()  # the same event loop and thread hand-over as Tk, without a window
+    gui.scheduler.attach(root)
+    gui.start_api()
+    if gui.api is None:
+        sys.exit("API did not start (see the debug log)")
+
+    lags = []
+    expected = [time.perf_counter() + LAG_TICK_SECS]
+
+    def tick():
+        now = time.perf_counter()
+        lags.append(max(0.0, now - expected[0]))
+        expected[0] = now + LAG_TICK_SECS
+        root.after(int(LAG_TICK_SECS * 1000), tick)
+
+    root.after(int(LAG_TICK_SECS * 1000), tick)
+    threading.Thread(target=lambda: (sys.stdin.read(), root.after(0, root.quit)), daemon=True).start()
+    print(gui.api.port, flush=True)
+    root.tk.mainloop(-1)  # a negative threshold keeps the loop going with no windows open
+
+    gui.api.stop()
+    gui.repo.finish()
+    gui.writer.shutdown(timeout=10)
+    print(json.dumps({"tk_after_lag": latency_ms(lags), "api": gui.api.stats, "repository": gui.repo.stats}))
+
+
+# === The client side ===
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("status", "today", "summary", "switch"):
+            raise SystemExit(f"unknown endpoint in --mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def build_request(name, rng, switch_to, port):
+    if name == "summary":
+        start = date.today() - timedelta(days=rng.randrange(365))
+        path, body = f"/summary?start={start}&end={start + timedelta(days=rng.choice((0, 6, 30)))}", None
+    elif name == "switch":
+        path, body = "/switch", json.dumps({"project": rng.choice(switch_to)}).encode()
+    else:
+        path, body = f"/{name}", None
+    head = f"{'POST' if body else 'GET'} {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+    if body:
+        head += f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+    return (head + "\r\n").encode() + (body or b"")
+
+
+async def client(port, deadline, mix, switch_to, seed, results, errors):
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            t0 = time.perf_counter()
+            writer.write(build_request(name, rng, switch_to, port))
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            await reader.readexactly(length)
+            if status == 200:
+                results.setdefault(name, []).append(time.perf_counter() - t0)
+            else:
+                errors[f"{name} {status}"] = errors.get(f"{name} {status}", 0) + 1
+    finally:
+        writer.close()
+
+
+async def run_load(args, port, mix, switch_to):
+    results, errors = {}, {}
+    deadline = time.perf_counter() + args.duration
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(port, deadline, mix, switch_to, i, results, errors) for i in range(args.clients)))
+    wall = time.perf_counter() - t0
+    total = sum(len(v) for v in results.values())
+    return {
+        "requests": total,
+        "requests_per_s": round(total / wall),
+        "errors": errors,
+        "endpoints": {name: latency_ms(values) for name, values in sorted(results.items())},
+        "all": latency_ms([v for values in results.values() for v in values]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    parser.add_argument("--standalone", action="store_true", help="start the app's API against synthetic data")
+    parser.add_argument("--port", type=int, default=config.API_PORT)
+    parser.add_argument("--backend", choices=("csv", "sqlite", "binary"), default="csv")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--mix", help="endpoint weights, e.g. status=6,today=3,summary=1,switch=0.1")
+    parser.add_argument("--switch-to", help="comma-separated projects for switch (default: the synthetic ones)")
+    parser.add_argument("--out", help="also write the results JSON here")
+    parser.add_argument("--serve", help=argparse.SUPPRESS)  # internal: data folder of the --standalone child
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    mix = parse_mix(args.mix or ("status=6,today=3,summary=1,switch=0.1" if args.standalone else "status=6,today=3,summary=1"))
+    switch_to = args.switch_to.split(",") if args.switch_to else project_names(args.projects) if args.standalone else []
+    if mix.get("switch") and not switch_to:
+        raise SystemExit("switch in --mix needs --switch-to with project names")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "standalone": args.standalone,
+            "clients": args.clients,
+            "duration_s": args.duration,
+            "mix": mix,
+        },
+    }
+    if not args.standalone:
+        report["results"] = asyncio.run(run_load(args, args.port, mix, switch_to))
+    else:
+        with tempfile.TemporaryDirectory() as data_dir:
+            write_log(os.path.join(data_dir, "sessionLog.csv"), **log_options(args))
+            write_projects(os.path.join(data_dir, "projectConfig.csv"), args.projects)
+            report["meta"].update(backend=args.backend, **log_options(args))
+            app = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve", data_dir, "--backend", args.backend],
+                                   stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+            try:
+                port = int(app.stdout.readline())
+                report["results"] = asyncio.run(run_load(args, port, mix, switch_to))
+            finally:
+                app.stdin.close()
+                app_stats = app.stdout.read()
+                app.wait()
+            report["app"] = json.loads(app_stats)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
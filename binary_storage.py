@@ -0,0 +1,300 @@
+# binary_storage.py
+"""Fixed-width binary session log, read through mmap.
+
+    python binary_storage.py to-binary sessionLog.csv sessionLog.bin
+    python binary_storage.py to-csv sessionLog.bin sessionLog.csv
+
+After a 16-byte header every session is one 20-byte little-endian record:
+    int64    start, microseconds since 1970-01-01 (naive local time, like the CSV log)
+    float64  duration in seconds (NaN while a session is still running)
+    int32    project ID from projectCatalog.csv (for converted files, the one beside the .bin)
+Daily totals and SessionTable loads view the mapped file through numpy.frombuffer without
+copying or parsing it; without numpy the records are unpacked with struct.iter_unpack instead.
+"""
+import argparse
+import csv
+import mmap
+import os
+import shutil
+import struct
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import config
+from catalog import ProjectCatalog
+from models import Session
+from storage import StorageBackend, checked_compaction, filter_rows, get_catalog, load_project_file, save_project_file
+
+try:
+    import numpy as np
+except ImportError:  # optional: without numpy the records are unpacked one by one
+    np = None
+
+
+HEADER = struct.Struct("<8sII")  # magic, record size, reserved
+MAGIC = b"TSLOGBIN"
+RECORD = struct.Struct("<qdi")
+EPOCH = datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+US = timedelta(microseconds=1)
+DAY_US = 86400 * 1000000
+RECORD_DTYPE = np.dtype([("start", "<i8"), ("duration", "<f8"), ("project", "<i4")]) if np is not None else None
+
+
+def to_us(dt: datetime) -> int:
+    return (dt - EPOCH) // US
+
+
+def from_us(us: int) -> datetime:
+    return EPOCH + timedelta(microseconds=us)
+
+
+def _day_bounds(start_date: Optional[date], end_date: Optional[date]) -> Tuple[int, int]:
+    # [lo, hi) in microseconds for an inclusive date range
+    lo = (start_date.toordinal() - EPOCH_ORDINAL) * DAY_US if start_date else -2 ** 63
+    hi = (end_date.toordinal() - EPOCH_ORDINAL + 1) * DAY_US if end_date else 2 ** 63 - 1
+    return lo, hi
+
+
+def _project_id(token: str, catalog: Optional[ProjectCatalog] = None) -> int:
+    # Rows written through storage carry "#<id>"; plain names (older CSV rows) go through the
+    # catalog, the app's own unless another is given
+    if token[:1] == "#" and token[1:].isdigit():
+        return int(token[1:])
+    return (get_catalog() if catalog is None else catalog).id_for(token)
+
+
+def pack_rows(rows: Iterable[Sequence], catalog: Optional[ProjectCatalog] = None) -> bytes:
+    # Raw (project, start, duration) rows, as the other backends yield them, to records
+    pack, nan = RECORD.pack, float("nan")
+    return b"".join(pack(to_us(datetime.fromisoformat(start)), float(duration) if duration not in ("", None) else nan,
+                         _project_id(project, catalog))
+                    for project, start, duration in rows)
+
+
+def pack_sessions(sessions: Iterable[Session]) -> bytes:
+    pack, nan = RECORD.pack, float("nan")
+    return b"".join(pack(to_us(s.start_time), nan if s.duration is None else s.duration, _project_id(s.project))
+                    for s in sessions)
+
+
+def _row(start: int, duration: float, project: int) -> Tuple[str, str, object]:
+    return f"#{project}", from_us(start).isoformat(), "" if duration != duration else duration
+
+
+class BinaryStorage(StorageBackend):
+    def __init__(self, log_file: str, config_file: str):
+        self.log_file = log_file
+        self.config_file = config_file
+        self.is_new = not os.path.exists(log_file)
+
+    def watched_files(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[str]:
+        return [self.log_file]
+
+    # === Writing ===
+
+    def _write(self, data: bytes):
+        # Replaces the whole log by way of a temporary file, so readers never see half of it
+        tmp_file = self.log_file + ".tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(HEADER.pack(MAGIC, RECORD.size, 0))
+            f.write(data)
+        os.replace(tmp_file, self.log_file)
+
+    def save_sessions(self, new_sessions: List[Session]):
+        data = pack_sessions(s for s in new_sessions if s.duration is not None)
+        if not os.path.exists(self.log_file):
+            self._write(data)
+            return
+        with open(self.log_file, "r+b") as f:
+            # Drop a record torn by a crash mid-write, or everything after it would be misaligned
+            size = f.seek(0, os.SEEK_END)
+            torn = (size - HEADER.size) % RECORD.size
+            if torn:
+                f.truncate(size - torn)
+                f.seek(size - torn)
+            f.write(data)
+
+    def overwrite_sessions(self, all_sessions: List[Session]):
+        self._write(pack_sessions(all_sessions))
+
+    def compact_adjustments(self) -> Tuple[int, int]:
+        if not os.path.exists(self.log_file):
+            return 0, 0
+        counts = {}
+        size_before = os.path.getsize(self.log_file)
+        self._write(pack_rows(checked_compaction(self.iter_rows(), counts)))
+        return counts.get("in", 0) - counts.get("out", 0), size_before - os.path.getsize(self.log_file)
+
+    # === Reading ===
+
+    @contextmanager
+    def _mapped(self):
+        # Yields (mmap, record count), or (None, 0) for a missing or empty log. Views of the map
+        # must be gone by the time the block exits, or closing it raises BufferError.
+        try:
+            f = open(self.log_file, "rb")
+        except FileNotFoundError:
+            yield None, 0
+            return
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            if size <= HEADER.size:
+                yield None, 0
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                magic, record_size, _ = HEADER.unpack_from(mm)
+                if magic != MAGIC or record_size != RECORD.size:
+                    raise ValueError(f"{self.log_file} is not a session log this version can read")
+                yield mm, (size - HEADER.size) // RECORD.size  # a torn final record is ignored
+
+    def iter_rows(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Iterator[Sequence]:
+        # Materialized so the map can be closed before the rows are used
+        lo, hi = _day_bounds(start_date, end_date)
+        with self._mapped() as (mm, count):
+            if not count:
+                return iter(())
+            if np is not None:
+                rows = _rows_numpy(mm, count, lo, hi)
+            else:
+                rows = [_row(*record) for record in _records(mm, count) if lo <= record[0] < hi]
+        return iter(rows)
+
+    def load_daily_totals(self, start_date: Optional[date] = None,
+                          end_date: Optional[date] = None) -> Dict[Tuple[date, str], float]:
+        lo, hi = _day_bounds(start_date, end_date)
+        with self._mapped() as (mm, count):
+            if not count:
+                return {}
+            if np is not None:
+                return _totals_numpy(mm, count, lo, hi)
+            totals, days = {}, {}
+            for start, duration, project in _records(mm, count):
+                if lo <= start < hi and duration and duration == duration:
+                    day = days.get(start // DAY_US)
+                    if day is None:
+                        day = days[start // DAY_US] = date.fromordinal(EPOCH_ORDINAL + start // DAY_US)
+                    key = (day, f"#{project}")
+                    totals[key] = totals.get(key, 0) + duration
+            return totals
+
+    def load_table(self, start_date: Optional[date] = None, end_date: Optional[date] = None):
+        if np is None:
+            return super().load_table(start_date, end_date)
+        lo, hi = _day_bounds(start_date, end_date)
+        with self._mapped() as (mm, count):
+            return _table_numpy(mm, count, lo, hi)
+
+    def delete_sessions_before(self, day: date):
+        self._write(pack_rows(self.iter_rows(start_date=day)))
+
+    def load_projects(self) -> List[str]:
+        return load_project_file(self.config_file)
+
+    def save_projects(self, projects: List[str]):
+        save_project_file(self.config_file, projects)
+
+    def migrate_from(self, source: StorageBackend) -> int:
+        # One-shot import of another backend's history, in its write order
+        rows = list(filter_rows(source.iter_rows()))
+        self._write(pack_rows(rows))
+        self.is_new = False
+        return len(rows)
+
+
+# Helpers that view the map; their numpy views are released when they return
+
+def _records(mm, count: int) -> List[Tuple[int, float, int]]:
+    with memoryview(mm) as view:
+        return list(RECORD.iter_unpack(view[HEADER.size:HEADER.size + count * RECORD.size]))
+
+
+def _selected(mm, count: int, lo: int, hi: int):
+    records = np.frombuffer(mm, dtype=RECORD_DTYPE, count=count, offset=HEADER.size)
+    starts = records["start"]
+    if lo == -2 ** 63 and hi == 2 ** 63 - 1:
+        return records.copy()
+    return records[(starts >= lo) & (starts < hi)]  # boolean indexing copies
+
+
+def _rows_numpy(mm, count: int, lo: int, hi: int) -> List[Tuple[str, str, object]]:
+    selected = _selected(mm, count, lo, hi)
+    return [_row(*record) for record in zip(selected["start"].tolist(), selected["duration"].tolist(),
+                                            selected["project"].tolist())]
+
+
+def _totals_numpy(mm, count: int, lo: int, hi: int) -> Dict[Tuple[date, str], float]:
+    records = np.frombuffer(mm, dtype=RECORD_DTYPE, count=count, offset=HEADER.size)
+    starts, durations = records["start"], records["duration"]
+    keep = (starts >= lo) & (starts < hi) & (durations != 0) & ~np.isnan(durations)
+    # One int64 key per (day, project): day number in the high bits, project ID in the low 32
+    keys = ((starts[keep] // DAY_US) << 32) | records["project"][keep].astype(np.int64)
+    unique, inverse = np.unique(keys, return_inverse=True)
+    sums = np.bincount(inverse.ravel(), weights=durations[keep], minlength=len(unique))
+    # Build each distinct date and project token once; object-array indexing then fans them out
+    day_numbers, day_index = np.unique(unique >> 32, return_inverse=True)
+    pids, pid_index = np.unique(unique & 0xFFFFFFFF, return_inverse=True)
+    days = np.array([date.fromordinal(EPOCH_ORDINAL + n) for n in day_numbers.tolist()], dtype=object)
+    tokens = np.array([f"#{pid}" for pid in pids.tolist()], dtype=object)
+    keys = zip(days[day_index.ravel()].tolist(), tokens[pid_index.ravel()].tolist())
+    return dict(zip(keys, sums.tolist()))
+
+
+def _table_numpy(mm, count: int, lo: int, hi: int):
+    from session_table import SessionTable
+    if not count:
+        return SessionTable()
+    selected = _selected(mm, count, lo, hi)
+    pids, project_ids = np.unique(selected["project"], return_inverse=True)
+    table = SessionTable([f"#{pid}" for pid in pids.tolist()])
+    return table._from_columns(selected["start"] / 1e6, selected["duration"], project_ids.ravel())
+
+
+# === Converters ===
+
+def converted_catalog(csv_path: str, bin_path: str) -> ProjectCatalog:
+    # The catalog for a converted log lives beside the .bin, started from the one beside the CSV
+    # (so its "#<id>" rows keep their names); the running app's catalog is never touched
+    name = os.path.basename(config.CATALOG_FILE)
+    path = os.path.join(os.path.dirname(os.path.abspath(bin_path)), name)
+    source = os.path.join(os.path.dirname(os.path.abspath(csv_path)), name)
+    if not os.path.exists(path) and os.path.exists(source):
+        shutil.copyfile(source, path)
+    return ProjectCatalog.load(path, seed=list)
+
+
+def csv_to_binary(csv_path: str, bin_path: str) -> int:
+    """Writes a sessionLog.csv-format file out as a binary log; returns the number of sessions.
+
+    Plain project names are given IDs in the projectCatalog.csv beside bin_path.
+    """
+    with open(csv_path, newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)  # header
+        rows = list(filter_rows(reader))
+    BinaryStorage(bin_path, "")._write(pack_rows(rows, converted_catalog(csv_path, bin_path)))
+    return len(rows)
+
+
+def binary_to_csv(bin_path: str, csv_path: str) -> int:
+    """Writes a binary log out in sessionLog.csv format; returns the number of sessions."""
+    rows = list(BinaryStorage(bin_path, "").iter_rows())
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Project", "Start", "Duration"])
+        writer.writerows(rows)
+    return len(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a session log between CSV and the binary format.")
+    parser.add_argument("direction", choices=["to-binary", "to-csv"])
+    parser.add_argument("source")
+    parser.add_argument("target")
+    args = parser.parse_args(argv)
+    convert = csv_to_binary if args.direction == "to-binary" else binary_to_csv
+    print(f"Converted {convert(args.source, args.target)} sessions to {args.target}")
+
+
+if __name__ == "__main__":
+    main()
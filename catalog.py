@@ -0,0 +1,218 @@
+# catalog.py
+import csv
+import os
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+
+# Session rows store "#<id>" instead of the project name. The catalog maps IDs to the current
+# name, so renaming, merging or archiving a project only rewrites this small file, never the
+# history. Rows written before the catalog existed hold plain names; those resolve through the
+# aliases (the first project to carry a name, recorded when it is renamed) or the current names.
+# The session writer thread encodes names (and may add projects) while the Tk thread edits the
+# catalog, so every lookup and update holds the catalog's lock; only cached name() hits skip it.
+ACTIVE, ARCHIVED, MERGED, ALIAS = "active", "archived", "merged", "alias"
+FIELDS = ["ID", "Name", "Status", "MergedInto"]
+
+
+class ProjectCatalog:
+    def __init__(self, path: str):
+        self.path = path
+        self.names: Dict[int, str] = {}  # id -> current name; active ones in popup order
+        self.status: Dict[int, str] = {}
+        self.merged_into: Dict[int, int] = {}
+        self.aliases: Dict[str, int] = {}  # former name -> id
+        self._by_name: Dict[str, int] = {}
+        self._cache: Dict[str, str] = {}  # stored token -> resolved name
+        self._lock = threading.RLock()
+
+    # === Loading and saving ===
+
+    @classmethod
+    def load(cls, path: str, seed: Callable[[], List[str]]) -> "ProjectCatalog":
+        # Reads the catalog, creating it from seed() (the plain project list) the first time
+        catalog = cls(path)
+        if not os.path.exists(path):
+            for name in seed():
+                catalog._add(name)
+            catalog._commit()
+            return catalog
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                pid = int(row["ID"])
+                if row["Status"] == ALIAS:
+                    catalog.aliases[row["Name"]] = pid
+                    continue
+                catalog.names[pid] = row["Name"]
+                catalog.status[pid] = row["Status"]
+                if row["MergedInto"]:
+                    catalog.merged_into[pid] = int(row["MergedInto"])
+        catalog._reindex()
+        return catalog
+
+    def save(self):
+        # Callers hold the lock
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(FIELDS)
+            for pid, name in self.names.items():
+                writer.writerow([pid, name, self.status[pid], self.merged_into.get(pid, "")])
+            for name, pid in self.aliases.items():
+                writer.writerow([pid, name, ALIAS, ""])
+        os.replace(tmp, self.path)
+
+    def _reindex(self):
+        self._cache.clear()
+        # Where names are shared, active projects win over archived ones and those over merged ones
+        by_name = {}
+        for status in (MERGED, ARCHIVED, ACTIVE):
+            by_name.update({name: pid for pid, name in self.names.items() if self.status[pid] == status})
+        self._by_name = by_name
+
+    def _commit(self):
+        self._reindex()
+        self.save()
+
+    # === Lookups ===
+
+    def _follow(self, pid: Optional[int]) -> Optional[int]:
+        seen = set()
+        while pid in self.merged_into and pid not in seen:
+            seen.add(pid)
+            pid = self.merged_into[pid]
+        return pid
+
+    def _id(self, name: str) -> Optional[int]:
+        # A name as typed in the GUI: current names first, then former ones
+        return self._follow(self._by_name.get(name, self.aliases.get(name)))
+
+    def _stored_id(self, token: str) -> Optional[int]:
+        # A token read from the log: "#<id>", or a plain name written before the catalog existed
+        if token[:1] == "#" and token[1:].isdigit() and int(token[1:]) in self.names:
+            return self._follow(int(token[1:]))
+        return self._follow(self.aliases.get(token, self._by_name.get(token)))
+
+    def name(self, token: str) -> str:
+        """Current project name for a stored token; unknown tokens pass through unchanged."""
+        name = self._cache.get(token)
+        if name is None:
+            with self._lock:
+                pid = self._stored_id(token)
+                name = self._cache[token] = token if pid is None else self.names[pid]
+        return name
+
+    def token(self, name: str) -> str:
+        """The "#<id>" to store for a project name, adding the project if it's new."""
+        with self._lock:
+            pid = self._id(name)
+            if pid is None:
+                pid = self._add(name)
+                self._commit()
+        return f"#{pid}"
+
+    def id_for(self, token: str) -> int:
+        # Project ID for a stored token (the binary log stores IDs only), adding an unknown plain name
+        with self._lock:
+            pid = self._stored_id(token)
+            return pid if pid is not None else int(self.token(token)[1:])
+
+    def tokens_for(self, names: Iterable[str]) -> Set[str]:
+        # Every stored form that resolves to one of names, for pushing a project filter down
+        wanted = set(names)
+        with self._lock:
+            candidates = [f"#{pid}" for pid in self.names] + list(self.names.values()) + list(self.aliases)
+        return {token for token in candidates if self.name(token) in wanted} | wanted
+
+    def active(self) -> List[str]:
+        with self._lock:
+            return [name for pid, name in self.names.items() if self.status[pid] == ACTIVE]
+
+    def decode_rows(self, rows: Iterable[Sequence]) -> Iterator[Sequence]:
+        name = self.name
+        for row in rows:
+            yield (name(row[0]), *row[1:]) if row else row
+
+    # === Updates: each one rewrites the catalog file only, never the session log ===
+
+    def _add(self, name: str) -> int:
+        pid = max(self.names, default=0) + 1
+        self.names[pid] = name
+        self.status[pid] = ACTIVE
+        return pid
+
+    def _rename(self, pid: int, new: str):
+        self.aliases.setdefault(self.names[pid], pid)
+        self.names[pid] = new
+
+    def _merge(self, pid: int, into: int):
+        if pid != into:
+            self.status[pid] = MERGED
+            self.merged_into[pid] = into
+
+    def rename(self, old: str, new: str):
+        # Renaming onto another active project's name merges the two
+        with self._lock:
+            pid, target = self._id(old), self._id(new)
+            if pid is None:
+                raise KeyError(old)
+            if target is not None and target != pid and self.status[target] == ACTIVE:
+                self._merge(pid, target)
+            else:
+                self._rename(pid, new)
+            self._commit()
+
+    def merge(self, source: str, target: str):
+        with self._lock:
+            pid, into = self._id(source), self._id(target)
+            if pid is None or into is None:
+                raise KeyError(source if pid is None else target)
+            self._merge(pid, into)
+            self._commit()
+
+    def archive(self, name: str):
+        with self._lock:
+            pid = self._id(name)
+            if pid is not None and self.status[pid] == ACTIVE:
+                self.status[pid] = ARCHIVED
+                self._commit()
+
+    def apply_edits(self, edits: Sequence[Tuple[Optional[str], str]]) -> List[str]:
+        """Applies a Manage Projects edit: one (original name or None if added, new name) per row.
+
+        Changed names are renames, rows ending up with the same name are merged, new rows are
+        added (or restored from the archive) and projects left out are archived. Returns the
+        active projects in the edited order.
+        """
+        with self._lock:
+            ids = [self._id(original) if original is not None else None for original, _ in edits]
+            row_ids = [None] * len(edits)
+            first_with_name = {}
+            # Existing rows first (all looked up before any rename, so swapping two names works),
+            # then the added ones, which may reuse a name another row just gave up
+            for adding in (False, True):
+                for i, (pid, (_, name)) in enumerate(zip(ids, edits)):
+                    if (pid is None) != adding:
+                        continue
+                    if name in first_with_name:
+                        if pid is not None:
+                            self._merge(pid, first_with_name[name])
+                        continue
+                    if pid is None:
+                        pid = self._id(name)
+                        if pid is None or pid in row_ids:
+                            pid = self._add(name)
+                    elif name != self.names[pid]:
+                        self._rename(pid, name)
+                    self.status[pid] = ACTIVE
+                    first_with_name[name] = row_ids[i] = pid
+            order = [pid for pid in row_ids if pid is not None]
+
+            for pid in self.names:
+                if pid not in order and self.status[pid] == ACTIVE:
+                    self.status[pid] = ARCHIVED
+            # Active projects first, in the edited order
+            for pid in order + [pid for pid in self.names if pid not in order]:
+                self.names[pid] = self.names.pop(pid)
+            self._commit()
+            return self.active()
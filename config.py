@@ -5,7 +5,70 @@ BASE_DIR = os.path.dirname(__file__)
 LOG_FILE = os.path.join(BASE_DIR, "timesheetLogEntries.csv")
 SESSION_FILE = os.path.join(BASE_DIR, "sessionLog.csv")
 CONFIG_FILE = os.path.join(BASE_DIR, "projectConfig.csv")
+CATALOG_FILE = os.path.join(BASE_DIR, "projectCatalog.csv")
 DEBUG_LOG_FILE = os.path.join(BASE_DIR, "debug_logfile.txt")
+SESSION_DIR = os.path.join(BASE_DIR, "sessions")
+SQLITE_FILE = os.path.join(BASE_DIR, "timesheet.db")
+BINARY_LOG_FILE = os.path.join(BASE_DIR, "sessionLog.bin")
+JOURNAL_FILE = os.path.join(BASE_DIR, "activeSession.journal")
+METRICS_FILE = os.path.join(BASE_DIR, "metrics.json")
+
+# Where sessions and projects are stored: "csv" (see SESSION_PARTITION, plus projectConfig.csv), "sqlite" (timesheet.db)
+# or "binary" (sessionLog.bin, fixed-width records; fastest to aggregate, see binary_storage.py).
+# The first run with "sqlite" or "binary" imports any existing CSV history.
+STORAGE_BACKEND = "csv"
+
+# How the csv backend splits sessions: "month" or "week" (ISO week) files under sessions/, or None
+# for a single sessionLog.csv. An existing sessionLog.csv is split up automatically on first run
+# (and renamed to sessionLog.csv.migrated). There is no way back: once sessions/ holds partitions,
+# None is refused at start-up rather than beginning an empty sessionLog.csv. Switching between
+# "month" and "week" is fine, as both kinds of file are read.
+SESSION_PARTITION = "month"
+
+# Net the rows written by "Edit Today's Log" into one correction record per day and project
+# when End Workday is used (also available on demand from the summary window)
+COMPACT_ON_END_WORKDAY = True
+
+# Crash journal for the active session: a checkpoint is written every JOURNAL_CHECKPOINT_SECS and
+# forced to disk (fsync) at most every JOURNAL_SYNC_SECS. After a crash the session is recovered up
+# to its last checkpoint, so at most that much time is lost.
+JOURNAL_CHECKPOINT_SECS = 30
+JOURNAL_SYNC_SECS = 300
+
+# All timers share one scheduler: timers due within SCHEDULER_COALESCE_SECS of each other (at most a
+# quarter of their interval) run in the same wakeup
+SCHEDULER_COALESCE_SECS = 2.0
+
+# Local HTTP/JSON API for editor plugins and shell hooks (see readme): switch project, status, today's
+# totals and date-range summaries on http://API_HOST:API_PORT while the app runs. There is no login, so
+# keep API_HOST on the loopback address. Status reads are served from a copy of today's totals that is
+# refreshed from the app after every change, or at least every API_REFRESH_SECS.
+API_ENABLED = False
+API_HOST = "127.0.0.1"
+API_PORT = 8765
+API_REFRESH_SECS = 5.0
+
+# Debug log: messages below DEBUG_LOG_LEVEL ("DEBUG", "INFO", "WARNING", ...) are dropped. The file is
+# rotated by "size" (every DEBUG_LOG_MAX_BYTES) or "time" (DEBUG_LOG_ROTATE_WHEN, e.g. "midnight"),
+# keeping DEBUG_LOG_BACKUPS old files.
+DEBUG_LOG_LEVEL = "INFO"
+DEBUG_LOG_ROTATION = "size"
+DEBUG_LOG_MAX_BYTES = 1024 * 1024
+DEBUG_LOG_ROTATE_WHEN = "midnight"
+DEBUG_LOG_BACKUPS = 5
+
+# Timing instrumentation of storage and GUI hot paths (takes effect on restart). When enabled the
+# figures are written to metrics.json at End Workday or with Ctrl+M in the main window.
+# With metrics enabled, METRICS_CAPTURE = ("show_summary_window", "cprofile") profiles the first call of that span
+# ("tracemalloc" traces its allocations); the output is written beside metrics.json.
+METRICS_ENABLED = False
+METRICS_CAPTURE = None
+
+# Timesheet export (Summary window and export.py): "week" (ISO week) or "month" buckets, with each
+# project's hours rounded to a multiple of EXPORT_ROUND_STEP ("nearest", "up" or "down"; 0 for no rounding)
+EXPORT_PERIOD = "week"
+EXPORT_ROUND_STEP = 0.25
+EXPORT_ROUND_MODE = "nearest"
 
 INTERVAL_OPTIONS = {
     # "10 secs": 10 * 1000,
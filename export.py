@@ -0,0 +1,141 @@
+# export.py
+"""Timesheet export: per-project hours per ISO week or month, as CSV or JSON Lines.
+
+    python export.py timesheet.csv --from 2025-01-01 --to 2025-12-31 --period week --round 0.25
+
+Sessions are streamed through the buckets, so memory use doesn't grow with the log.
+Break is left out (as in the summary's excl-Breaks total) unless --include-breaks is given.
+Each project's hours are rounded per bucket and the bucket total adds up the rounded
+figures, so the numbers can be copied straight into a timesheet.
+"""
+import argparse
+import csv
+import json
+import math
+import sys
+from datetime import date, timedelta
+from typing import Dict, Iterable, Iterator, Optional, TextIO, Tuple
+
+import config
+from models import Session
+from storage import iter_sessions
+
+Bucket = Tuple[str, date, date, Dict[str, float]]  # (label, first day, last day, {project: seconds})
+ROUNDING = {"nearest": lambda units: math.floor(units + 0.5), "up": math.ceil, "down": math.floor}
+
+
+def bucket_of(day: date, period: str) -> Tuple[str, date, date]:
+    # Label ("2025-W03" or "2025-01", as partition files are named) and first/last day
+    if period == "week":
+        year, week, weekday = day.isocalendar()
+        first = day - timedelta(days=weekday - 1)
+        return f"{year}-W{week:02d}", first, first + timedelta(days=6)
+    if period == "month":
+        first = day.replace(day=1)
+        return first.strftime("%Y-%m"), first, (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    raise ValueError(f"Unknown export period: {period!r}")
+
+
+def iter_buckets(sessions: Iterable[Session], period: str = "week", include_breaks: bool = False) -> Iterator[Bucket]:
+    """Totals sessions per bucket, oldest first, yielding each bucket once it's complete.
+
+    The log is in save order, which can run slightly behind start order (a session running
+    over midnight on a Sunday), so the previous bucket stays open until the next one starts.
+    """
+    open_buckets: Dict[str, Bucket] = {}
+    last_day = bucket = None
+    for s in sessions:
+        if not s.duration or (s.project == "Break" and not include_breaks):
+            continue
+        day = s.start_time.date()
+        if day != last_day:
+            last_day, bucket = day, bucket_of(day, period)
+        label = bucket[0]
+        if label not in open_buckets:
+            for older in sorted(open_buckets)[:-1]:  # all but the newest are complete
+                yield open_buckets.pop(older)
+            open_buckets[label] = (*bucket, {})
+        totals = open_buckets[label][3]
+        totals[s.project] = totals.get(s.project, 0) + s.duration
+    for label in sorted(open_buckets):
+        yield open_buckets[label]
+
+
+def round_hours(seconds: float, step: float = 0.01, mode: str = "nearest") -> float:
+    # Hours rounded to a multiple of step (e.g. 0.25 for quarter hours); a step of 0 leaves them unrounded
+    if step < 0:
+        raise ValueError(f"rounding step must be 0 or a positive number of hours, not {step}")
+    if not step:
+        return round(seconds / 3600, 6)
+    units = round(seconds / 3600 / step, 9)  # drop float noise so exact multiples stay put
+    return round(ROUNDING[mode](units) * step, 6)
+
+
+def bucket_hours(bucket: Bucket, step: float, mode: str) -> Tuple[Dict[str, float], float]:
+    projects = {project: round_hours(seconds, step, mode) for project, seconds in sorted(bucket[3].items())}
+    return projects, round(sum(projects.values()), 6)
+
+
+def write_export(buckets: Iterable[Bucket], out: TextIO, fmt: str = "csv",
+                 step: float = 0.01, mode: str = "nearest") -> int:
+    """Writes buckets to out as "csv" or "jsonl"; returns how many were written."""
+    count = 0
+    writer = csv.writer(out, lineterminator="\n") if fmt == "csv" else None
+    if writer:
+        writer.writerow(["Period", "Start", "End", "Project", "Hours"])
+    for bucket in buckets:
+        label, first, last, _ = bucket
+        projects, total = bucket_hours(bucket, step, mode)
+        if writer:
+            for project, hours in projects.items():
+                writer.writerow([label, first.isoformat(), last.isoformat(), project, hours])
+            writer.writerow([label, first.isoformat(), last.isoformat(), "TOTAL", total])
+        else:
+            out.write(json.dumps({"period": label, "start": first.isoformat(), "end": last.isoformat(),
+                                  "projects": projects, "total": total}) + "\n")
+        count += 1
+    return count
+
+
+def export_timesheet(path: str, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                     period: str = config.EXPORT_PERIOD, step: float = config.EXPORT_ROUND_STEP,
+                     mode: str = config.EXPORT_ROUND_MODE, include_breaks: bool = False,
+                     fmt: Optional[str] = None) -> int:
+    """Exports saved sessions to path; fmt defaults to "jsonl" for .jsonl files, else "csv"."""
+    fmt = fmt or ("jsonl" if path.lower().endswith((".jsonl", ".json")) else "csv")
+    buckets = iter_buckets(iter_sessions(start_date, end_date), period, include_breaks)
+    with open(path, "w", newline="") as f:
+        return write_export(buckets, f, fmt, step, mode)
+
+
+def round_step(text: str) -> float:
+    step = float(text)
+    if step < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 (no rounding) or a positive number of hours, not {text}")
+    return step
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="file to write, or - for stdout")
+    parser.add_argument("--from", dest="start_date", type=date.fromisoformat, help="first day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end_date", type=date.fromisoformat, help="last day (YYYY-MM-DD)")
+    parser.add_argument("--period", choices=("week", "month"), default=config.EXPORT_PERIOD)
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="default: from the file extension")
+    parser.add_argument("--round", dest="step", type=round_step, default=config.EXPORT_ROUND_STEP,
+                        help="hours step, e.g. 0.25; 0 for no rounding")
+    parser.add_argument("--rounding", choices=sorted(ROUNDING), default=config.EXPORT_ROUND_MODE)
+    parser.add_argument("--include-breaks", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.path == "-":
+        buckets = iter_buckets(iter_sessions(args.start_date, args.end_date), args.period, args.include_breaks)
+        write_export(buckets, sys.stdout, args.format or "csv", args.step, args.rounding)
+    else:
+        count = export_timesheet(args.path, args.start_date, args.end_date, args.period, args.step,
+                                 args.rounding, args.include_breaks, args.format)
+        print(f"Exported {count} {args.period}s to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,37 @@
 # gui.py
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, filedialog
 from tkinter.messagebox import askokcancel, WARNING
-from datetime import datetime, date
+from datetime import datetime, date, time
 import os, sys
-from tracker import switch_project, compute_totals, finalize_sessions
-from storage import save_sessions, load_sessions, load_projects, save_projects, overwrite_sessions
-from config import INTERVAL_OPTIONS, DEFAULT_INTERVAL, CONFIG_FILE
+import itertools
+import logging
+from tracker import summary_pivot
+from storage import load_projects, update_projects, project_name, is_adjustment_group
+from session_repository import SessionRepository
+from config import INTERVAL_OPTIONS, DEFAULT_INTERVAL, CONFIG_FILE, COMPACT_ON_END_WORKDAY, METRICS_ENABLED, METRICS_CAPTURE, EXPORT_PERIOD, JOURNAL_CHECKPOINT_SECS, SCHEDULER_COALESCE_SECS, API_HOST, API_PORT, API_REFRESH_SECS
+from export import export_timesheet
 from utils import format_seconds, log_debug_event
 from models import Session
-import pandas as pd
+from summary_grid import VirtualTable
+from journal import SessionJournal, read_journal
+from metrics import timed, capture_next, dump_metrics
+from scheduler import Scheduler
+from api_server import ApiServer, ApiError
 
 # Global GUI state
-root = tk.Tk()
-root.withdraw()
-
+root = None  # the app's single Tk interpreter, created by get_root()
 popup = None
 status_label = None
 interval_var = None
+project_frame = None
+project_rows = {}  # project -> its row frame (button + time label)
 project_buttons = {}
 project_time_labels = {}
+shown_projects = []  # project list the popup rows were last built for
+popup_reschedule = None  # launch.pyw's reschedule callback, kept for buttons built on later calls
 total_time_label = None
-update_ui_handle = None
+displayed_text = {}  # label -> text it currently shows, so update_ui only reconfigures labels that change
 open_window = None  # Used to track the currently open secondary window
 open_window_type = None  # Used to track what type of window is currently open
 
@@ -34,11 +44,62 @@ edit_win_bg = "#3EA5CC" # Edit log window
 
 
 # Application state
-sessions = [s for s in load_sessions(for_date=date.today()) if s.duration is not None]
-current_project = sessions[-1].project if sessions and sessions[-1].duration is None else None
+repo = SessionRepository()  # every session read and write; today's sessions and the summary totals are cached
+writer = repo.writer  # saves sessions off the Tk thread
+journal = SessionJournal()  # crash journal for the active session
+scheduler = Scheduler(SCHEDULER_COALESCE_SECS)  # owns every timer (popup, UI refresh, journal checkpoint)
+api = None  # local HTTP API, if started (see start_api)
+journal_recovered = False  # the journal left by a previous run is only read once, at the first popup
+current_project = None
 selected_interval = DEFAULT_INTERVAL
 INTERVAL = INTERVAL_OPTIONS[selected_interval]
 
+if METRICS_ENABLED and METRICS_CAPTURE:
+    capture_next(*METRICS_CAPTURE)
+
+
+def get_root():
+    # Creates the hidden Tk root on first use; launch.pyw and every window share it
+    global root
+    if root is None:
+        root = tk.Tk()
+        root.withdraw()
+        scheduler.attach(root)
+        scheduler.every("checkpoint", JOURNAL_CHECKPOINT_SECS, checkpoint_tick)
+    return root
+
+
+def load_today_sessions():
+    # Deferred until the first popup so importing gui stays cheap. Later calls are cache hits
+    # unless the log was edited outside the app.
+    global journal_recovered
+    if not journal_recovered:
+        journal_recovered = True
+        recover_interrupted_session()
+    repo.today()
+
+
+def recover_interrupted_session():
+    # Sessions left in the journal mean the last run ended without saving them (crash, power cut,
+    # reboot without End Workday). The active one is saved up to its last checkpoint; anything that
+    # already made it to disk is skipped. Adjustment pairs from Edit Today's Log share a start time and
+    # go back in together as an adjustment so the index does not count the negative row as time.
+    for start, group in itertools.groupby(read_journal(), key=lambda s: s.start_time):
+        group = list(group)
+        saved = {s.project for s in repo.sessions(start.date(), start.date()) if s.start_time == start}
+        if any(project_name(s.project) in saved for s in group):
+            log_debug_event("Journal session %s was already saved.", group[0].project)
+        elif is_adjustment_group([(s.project, s.start_time, s.duration) for s in group]):
+            repo.add(group, adjustment=True)
+            for s in group:
+                log_debug_event("Recovered interrupted adjustment: %s %+.0fs", s.project, s.duration)
+        else:
+            for recovered in group:
+                if recovered.duration:
+                    repo.add([recovered])
+                    log_debug_event("Recovered interrupted session: %s +%.0fs", recovered.project, recovered.duration)
+    journal.clear(unsaved=writer.pending())
+
 
 def handle_window_request(requested_type):
     # Function checks on a button click if the requested subwindow is already open. If so it is brough to the foreground.
@@ -71,24 +132,69 @@ def offset_position_near_popup(offset_x=50, offset_y=50):
 
 
 def end_workday():
-    global sessions, update_ui_handle
     answer = askokcancel('Confirm exit', 'Save final log entry and quit Timesheet Logger app?', icon=WARNING, parent=popup)
     if answer:
         log_debug_event("End of workday triggered.")
-        sessions = finalize_sessions(sessions)
-        save_sessions(sessions)
+        repo.finish()
+        if not writer.flush(timeout=30):
+            journal.clear(unsaved=writer.pending())
+            show_write_errors()
+            tk.messagebox.showerror("Save failed", "Could not save the log. Timesheet Logger will stay open; "
+                                    "try End Workday again once the disk is reachable.", parent=popup)
+            return
+        writer.shutdown()
+        journal.clear()
+        log_debug_event("Journal: %d writes, %d fsyncs, %.1fms syncing.", journal.stats["writes"],
+                        journal.stats["syncs"], journal.stats["sync_secs"] * 1000)
+        if COMPACT_ON_END_WORKDAY:
+            run_compaction()
+        if METRICS_ENABLED:
+            save_metrics()
+
+        scheduler.stop()
+        if api:
+            api.stop()
+        log_debug_event("Scheduler: %s", scheduler.stats)
+        log_debug_event("Session cache: %s", repo.stats)
 
-        if update_ui_handle:
-            popup.after_cancel(update_ui_handle)
-            update_ui_handle = None
-        
         try:
             popup.destroy()
             root.destroy()
             log_debug_event("Application shutdown completed.")
             sys.exit()
         except Exception as e:
-            log_debug_event(f"Shutdown failed: {e}")
+            log_debug_event("Shutdown failed: %s", e)
+
+
+def show_write_errors():
+    # Background write failures are handed back here on the Tk thread
+    for e in writer.pop_errors():
+        log_debug_event("Saving sessions failed (will retry): %s", e)
+        if status_label:
+            set_label_text(status_label, f"Save failed, retrying: {e}")
+
+
+def save_metrics(event=None):
+    log_debug_event("Metrics written to %s", dump_metrics())
+
+
+def run_compaction():
+    # Returns (rows removed, bytes removed), or None if the log was left untouched
+    try:
+        rows, size = repo.compact_adjustments()
+    except (OSError, ValueError) as e:
+        log_debug_event("Adjustment compaction failed, log left unchanged: %s", e)
+        return None
+    log_debug_event("Compacted adjustments: removed %d rows, %d bytes.", rows, size)
+    return rows, size
+
+
+def rename_loaded_sessions():
+    # Brings today's in-memory sessions in line with renamed or merged projects
+    global current_project
+    repo.rename_projects()
+    if current_project:
+        current_project = project_name(current_project)
 
 
 def open_manage_projects(projects):
@@ -111,7 +217,7 @@ def open_manage_projects(projects):
     entry_frame = tk.Frame(manage_win, bg=manproj_win_bg)
     entry_frame.pack(fill="both", expand=True, padx=10)
 
-    project_vars = []
+    project_vars = []  # (name the row was loaded with, or None if added here; its entry variable)
     
     def add_row(name=""):
         row = tk.Frame(entry_frame, bg=manproj_win_bg)
@@ -121,17 +227,18 @@ def open_manage_projects(projects):
         entry = tk.Entry(row, textvariable=var, width=30)
         entry.pack(side="left", fill="x", expand=True)
 
-        btn = tk.Button(row, text="❌", command=lambda: remove_row(row, var))
+        item = (name or None, var)
+        btn = tk.Button(row, text="❌", command=lambda: remove_row(row, item))
         btn.pack(side="left", padx=5)
-        project_vars.append(var)
+        project_vars.append(item)
 
         # Resize window after adding row
         manage_win.update_idletasks()
         new_height = manage_win.winfo_reqheight() + 20
         manage_win.geometry(f"300x{new_height}")
 
-    def remove_row(row_widget, var):
-        project_vars.remove(var)
+    def remove_row(row_widget, item):
+        project_vars.remove(item)
         row_widget.destroy()
 
         manage_win.update_idletasks()
@@ -142,12 +249,14 @@ def open_manage_projects(projects):
         add_row(name)
 
     def save_and_close():
-        new_projects = [var.get().strip() for var in project_vars if var.get().strip()]
-        if new_projects:
-            save_projects(new_projects)
-            log_debug_event(f"Saved updated project list: {new_projects}")
+        # Edited names are renames (or merges, if two rows end up with the same name) and removed
+        # rows are archived; only the project catalog changes, never the logged history
+        edits = [(original, var.get().strip()) for original, var in project_vars if var.get().strip()]
+        if edits:
+            new_projects = update_projects(edits)
+            log_debug_event("Saved updated project list: %s", new_projects)
+            rename_loaded_sessions()
             manage_win.destroy()
-            popup.destroy()
             show_popup(new_projects)
         else:
             log_debug_event("Attempted to save empty project list. Ignored.")
@@ -160,6 +269,7 @@ def open_manage_projects(projects):
     manage_win.geometry(f"300x{height}")
 
 
+@timed("show_summary_window")
 def show_summary_window():
     global open_window
 
@@ -167,39 +277,22 @@ def show_summary_window():
         return
 
     log_debug_event("Summary window opened.")
-    all_sessions = load_sessions()
+    totals = dict(repo.daily_totals())  # {(date, project): seconds}, cached until the log changes on disk
 
     # Include active session duration as of now
     now = datetime.now()
-    if sessions and sessions[-1].duration is None:
-        active = sessions[-1]
+    if repo.active:
+        active = repo.active
         active_duration = (now - active.start_time).total_seconds()
-        all_sessions.append(Session(active.project, active.start_time, active_duration))
-        log_debug_event(f"Added active session to summary: {active.project} +{active_duration:.0f}s")
+        key = (active.start_time.date(), active.project)
+        totals[key] = totals.get(key, 0) + active_duration
+        log_debug_event("Added active session to summary: %s +%.0fs", active.project, active_duration)
 
-    if not all_sessions:
+    if not totals:
         tk.messagebox.showinfo("No Data", "No session data found.")
         return
 
-    # Build DataFrame
-    rows = [
-        {"Date": s.start_time.date(), "Project": s.project, "Hours": s.duration / 3600}
-        for s in all_sessions if s.duration
-    ]
-    if not rows:
-        tk.messagebox.showinfo("No Data", "No completed sessions available.")
-        return
-
-    df = pd.DataFrame(rows)
-    summary = df.pivot_table(
-        index="Project", columns="Date", values="Hours",
-        aggfunc="sum", fill_value=0
-    ).sort_index(axis=1)
-
-    summary = summary.round(2)
-
-    dates = summary.columns
-    projects = summary.index.tolist()
+    dates, projects, hours, total_all, total_no_break = summary_pivot(totals)
 
     # Create summary window
     summary_win = tk.Toplevel(popup)
@@ -209,80 +302,79 @@ def show_summary_window():
     open_window = summary_win
     summary_win.geometry(offset_position_near_popup())
 
+    # === Table (only the visible cells are drawn; header, project column and totals stay pinned) ===
+    table = VirtualTable(
+        summary_win,
+        row_labels=projects,
+        col_labels=[d.strftime("%a %d %b") for d in dates],
+        values=hours,
+        footer_rows=[
+            ("TOTAL", total_all, "#e0e0e0"),
+            ("TOTAL (excl Breaks)", total_no_break, "#d0ffd0"),
+        ],
+        bg=summary_win_bg,
+        corner_label="Project",
+    )
+    table.pack(side="top", fill="both", expand=True)
 
-    # === Scrollable Canvas Setup ===
-    canvas = tk.Canvas(summary_win, bg=summary_win_bg, height=400)
-    h_scroll = tk.Scrollbar(summary_win, orient="horizontal", command=canvas.xview)
-    canvas.configure(xscrollcommand=h_scroll.set)
-
-    h_scroll.pack(side="bottom", fill="x")
-    canvas.pack(side="top", fill="both", expand=True)
-
-    table_frame = tk.Frame(canvas, bg=summary_win_bg)
-    canvas.create_window((0, 0), window=table_frame, anchor="nw")
-
-    def on_frame_configure(event):
-        canvas.configure(scrollregion=canvas.bbox("all"))
-
-    table_frame.bind("<Configure>", on_frame_configure)
-
-    # === Table Header ===
-    tk.Label(table_frame, text="Project", font=("Arial", 10, "bold"), bg=summary_win_bg).grid(row=0, column=0, padx=4, pady=2)
-    for c, d in enumerate(dates, start=1):
-        tk.Label(table_frame, text=d.strftime("%a %d %b"), font=("Arial", 10, "bold"), bg=summary_win_bg)\
-            .grid(row=0, column=c, padx=4, pady=2)
-
-    # === Table Body ===
-    for r, proj in enumerate(projects, start=1):
-        tk.Label(table_frame, text=proj, font=("Arial", 10, "bold"), bg=summary_win_bg)\
-            .grid(row=r, column=0, sticky="w", padx=4)
-        for c, d in enumerate(dates, start=1):
-            val = summary.loc[proj, d]
-            tk.Label(table_frame, text=f"{val:.2f}", bg="white", width=10)\
-                .grid(row=r, column=c, padx=1, pady=1)
-
-    # === Totals ===
-    total_all = summary.sum()
-    tk.Label(table_frame, text="TOTAL", font=("Arial", 10, "bold"), bg="#e0e0e0")\
-        .grid(row=r+1, column=0, sticky="w", padx=4)
-    for c, d in enumerate(dates, start=1):
-        tk.Label(table_frame, text=f"{total_all[d]:.2f}", bg="#e0e0e0", width=10)\
-            .grid(row=r+1, column=c, padx=1, pady=1)
-
-    if 'Break' in summary.index:
-        no_break = summary.drop('Break')
-    else:
-        no_break = summary
-    total_no_break = no_break.sum()
-
-    tk.Label(table_frame, text="TOTAL (excl Breaks)", font=("Arial", 10, "bold"), bg="#d0ffd0")\
-        .grid(row=r+2, column=0, sticky="w", padx=4)
-    for c, d in enumerate(dates, start=1):
-        tk.Label(table_frame, text=f"{total_no_break[d]:.2f}", bg="#d0ffd0", width=10)\
-            .grid(row=r+2, column=c, padx=1, pady=1)
-
-    # === Delete Button INSIDE table_frame ===
+    # === Delete Button ===
     def delete_past_entries():
         answer = askokcancel('Confirmation', 'Are you sure?  This will delete all past log entries up to and including yesterday!', icon=WARNING, parent=summary_win)
         if answer:
-            today = date.today()
-            updated = [s for s in all_sessions if s.start_time.date() == today]
-            overwrite_sessions(updated)
+            repo.delete_sessions_before(date.today())
             log_debug_event("Deleted past session entries.")
             summary_win.destroy()
             show_summary_window()
 
+    def compact_log():
+        result = run_compaction()
+        if result is None:
+            tk.messagebox.showerror("Compact Adjustments", "Compaction failed; the log was left unchanged.", parent=summary_win)
+        else:
+            tk.messagebox.showinfo("Compact Adjustments", f"Removed {result[0]} rows ({result[1]} bytes).", parent=summary_win)
+
+    def export_log():
+        # Saved sessions only, like the report; the active one is exported once it is logged
+        path = filedialog.asksaveasfilename(
+            parent=summary_win, title="Export Timesheet", defaultextension=".csv",
+            initialfile=f"timesheet-{date.today().isoformat()}.csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")],
+        )
+        if not path:
+            return
+        writer.flush()
+        try:
+            count = export_timesheet(path)
+        except OSError as e:
+            log_debug_event("Export to %s failed: %s", path, e)
+            tk.messagebox.showerror("Export Timesheet", f"Could not write {path}: {e}", parent=summary_win)
+            return
+        log_debug_event("Exported %d %ss to %s.", count, EXPORT_PERIOD, path)
+        tk.messagebox.showinfo("Export Timesheet", f"Exported {count} {EXPORT_PERIOD}s to {path}.", parent=summary_win)
+
+    btn_frame = tk.Frame(summary_win, bg=summary_win_bg)
+    btn_frame.pack(pady=(15, 5))
+
+    tk.Button(
+        btn_frame, text="Export Timesheet", command=export_log, font=("Arial", 10, "bold")
+    ).grid(row=0, column=0, padx=5)
+
+    tk.Button(
+        btn_frame, text="Compact Adjustments", command=compact_log, font=("Arial", 10, "bold")
+    ).grid(row=0, column=1, padx=5)
+
     del_btn = tk.Button(
-        table_frame, text="Delete Past Entries", command=delete_past_entries,
+        btn_frame, text="Delete Past Entries", command=delete_past_entries,
         fg="white", bg="red", font=("Arial", 10, "bold")
     )
-    del_btn.grid(row=r+3, column=0, columnspan=len(dates)+1, pady=(15, 5))
+    del_btn.grid(row=0, column=2, padx=5)
 
     # === Final Resize ===
     summary_win.update_idletasks()
     summary_win.geometry("")  # Let the window auto-size cleanly to its contents
 
 
+@timed("open_edit_log_window")
 def open_edit_log_window():
     global open_window
 
@@ -293,22 +385,9 @@ def open_edit_log_window():
     today = date.today()
 
     now = datetime.now()
-    day_sessions = []
-
-    for s in sessions:
-        if s.start_time.date() == today:
-            if s.duration is not None:
-                day_sessions.append(s)
-            else:
-                # Active session: simulate duration
-                active_duration = (now - s.start_time).total_seconds()
-                day_sessions.append(Session(s.project, s.start_time, active_duration))
-                log_debug_event(f"Included active session in Edit Log: {s.project} +{active_duration:.0f}s")
-
-    # Totals per project
-    totals = {}
-    for s in day_sessions:
-        totals[s.project] = totals.get(s.project, 0) + s.duration
+
+    # Totals per project since midnight, the active session counted up to now
+    totals = repo.index.totals(start=datetime.combine(today, time.min), now=now, resolve=project_name)
 
     if not totals:
         tk.messagebox.showinfo("No data", "No logged sessions for today.")
@@ -366,16 +445,7 @@ def open_edit_log_window():
     edit_win.update_idletasks()
 
     def apply_adjustment():
-        global sessions
-
-        # Finalize and save active session before editing
-        finalized = finalize_sessions(sessions)
-        new_finalized = [s for s in finalized if s.duration is not None]
-        if new_finalized:
-            save_sessions(new_finalized)
-            log_debug_event(f"Auto-saved active session(s) before adjustment: {[s.project for s in new_finalized]}")
-        sessions = finalized
-        
+        # The entry is checked before anything is saved, so a rejected one leaves the active session running
         try:
             hrs = float(hours_var.get())
             if hrs <= 0:
@@ -396,32 +466,29 @@ def open_edit_log_window():
             msg_label.config(text=f"Only {available:.2f} hrs in '{from_proj}'.")
             return
 
+        # Finalize and save active session before editing
+        finalized = repo.finish()
+        if finalized:
+            journal.clear(unsaved=writer.pending())
+            log_debug_event("Auto-saved active session before adjustment: %s", finalized.project)
+
         # Apply adjustment by appending sessions
         seconds = hrs * 3600
         now = datetime.now()
         
-        new_adjustments = [Session(from_proj, now, -seconds), Session(to_proj, now, seconds)]
-        save_sessions(new_adjustments)
-        sessions.extend(new_adjustments)
+        repo.add([Session(from_proj, now, -seconds), Session(to_proj, now, seconds)], adjustment=True)
 
-        log_debug_event(f"Moved {hrs:.2f} hrs from {from_proj} to {to_proj} for today.")
+        log_debug_event("Moved %.2f hrs from %s to %s for today.", hrs, from_proj, to_proj)
 
         # Restart the session on the same project (if one was active before applying an edit)
-        if new_finalized:
-            last_project = new_finalized[-1].project
-            from tracker import switch_project
-            sessions = switch_project(sessions, last_project)
-            log_debug_event(f"Restarted session for {last_project} after edit.")
+        if finalized:
+            repo.switch_project(finalized.project)
+            journal.start(finalized.project, repo.active.start_time, unsaved=writer.pending())
+            log_debug_event("Restarted session for %s after edit.", finalized.project)
+        else:
+            journal.clear(unsaved=writer.pending())
 
         edit_win.destroy()
-        # Reload sessions from disk
-        persisted_sessions = load_sessions(for_date=date.today())
-
-        # If a new session was just restarted in memory, keep it
-        if sessions and sessions[-1].duration is None:
-            persisted_sessions.append(sessions[-1])
-
-        sessions = persisted_sessions
         show_popup(load_projects())
 
     # Buttons
@@ -432,57 +499,70 @@ def open_edit_log_window():
     tk.Button(btn_frame, text="Cancel", command=edit_win.destroy, width=10).grid(row=0, column=1, padx=5)
 
 
+@timed("show_popup")
 def show_popup(projects, reschedule_callback=None):
-    main_win_bg = "#61C4E9"
-    global popup, status_label, interval_var, project_buttons, total_time_label
+    global popup_reschedule
 
-    log_debug_event("Popup displayed.")
+    log_debug_event("Popup displayed.", level=logging.DEBUG)
+    load_today_sessions()
+    if reschedule_callback:
+        popup_reschedule = reschedule_callback
 
+    # Widgets are built once and then updated in place on every interval
+    resized = False
     if not popup or not popup.winfo_exists():
-        popup = tk.Toplevel(root)
-        popup.title("Time Tracker")
-        popup.configure(bg=main_win_bg)
-        popup.protocol("WM_DELETE_WINDOW", popup.iconify)
-
-    popup.deiconify()
-    popup.attributes('-topmost', True)
-    for widget in popup.winfo_children():
-        widget.destroy()
-
-    tk.Label(popup, text="What are you working on?", font=("Arial", 16), bg=main_win_bg).pack(pady=5)
+        build_popup()
+        resized = True
+    resized |= sync_project_rows(projects)
 
     now = datetime.now()
     status = f"Last logged: {current_project + ' at ' + now.strftime('%H:%M:%S') if current_project else '-'}"
+    set_label_text(status_label, status)
+    highlight_current_project()
+
+    popup.deiconify()
+    popup.attributes('-topmost', True)
 
+    # Refresh the times now rather than at the next tick
+    update_ui()
 
-    status_label = tk.Label(popup, text=status, font=("Arial", 10), bg=main_win_bg)
-    status_label.pack(pady=5)
+    if resized:
+        popup.update_idletasks()
+        width = 320
+        height = popup.winfo_reqheight()
+        popup.geometry(f"{width}x{height}")
 
-    button_frame = tk.Frame(popup, bg=main_win_bg)
-    button_frame.pack(pady=10)
 
+def build_popup():
+    main_win_bg = "#61C4E9"
+    global popup, status_label, interval_var, project_frame, total_time_label
+
+    popup = tk.Toplevel(get_root())
+    popup.title("Time Tracker")
+    popup.configure(bg=main_win_bg)
+    popup.protocol("WM_DELETE_WINDOW", popup.iconify)
+    if METRICS_ENABLED:
+        popup.bind("<Control-m>", save_metrics)
+    # The once-a-second refresh only runs while the window can be seen
+    popup.bind("<Map>", lambda e: e.widget is popup and scheduler.set_visible(True))
+    popup.bind("<Unmap>", lambda e: e.widget is popup and scheduler.set_visible(False))
+    scheduler.every("update_ui", 1, update_ui, visible_only=True)
+
+    project_rows.clear()
     project_buttons.clear()
     project_time_labels.clear()
+    displayed_text.clear()
+    shown_projects.clear()
 
-    for project in projects:
-        row = tk.Frame(button_frame, bg=main_win_bg)
-        row.pack(pady=3)
-
-        btn = tk.Button(
-            row, text=project,
-            width=25, height=2,
-            bg="#00FF00" if project == current_project else "#f0f0f0",
-            command=lambda p=project: on_project_click(p, reschedule_callback)
-        )
-        btn.pack(side="left")
+    tk.Label(popup, text="What are you working on?", font=("Arial", 16), bg=main_win_bg).pack(pady=5)
 
-        time_lbl = tk.Label(row, text="00:00:00", font=("Arial", 10), bg=main_win_bg)
-        time_lbl.pack(side="left", padx=10)
+    status_label = tk.Label(popup, text="", font=("Arial", 10), bg=main_win_bg)
+    status_label.pack(pady=5)
 
-        project_buttons[project] = btn
-        project_time_labels[project] = time_lbl
+    project_frame = tk.Frame(popup, bg=main_win_bg)
+    project_frame.pack(pady=10)
 
-    total_time_label = tk.Label(popup, text="Total time logged today: 00:00:00", font=("Arial", 12), bg=main_win_bg)
+    total_time_label = tk.Label(popup, text="Total time logged today: 00:00:00", font=("Arial", 10), bg=main_win_bg)
     total_time_label.pack(pady=10)
 
     # 2x2 button grid
@@ -520,68 +600,149 @@ def show_popup(projects, reschedule_callback=None):
     interval_var = tk.StringVar(value=selected_interval)
     option_menu = ttk.OptionMenu(
         interval_frame, interval_var, selected_interval, *INTERVAL_OPTIONS.keys(),
-        command=lambda new_value: on_interval_change(new_value, reschedule_callback)
+        command=lambda new_value: on_interval_change(new_value, popup_reschedule)
     )
     option_menu.pack(side="left")
+    log_debug_event("Popup widgets built.")
 
-    update_ui()
-    popup.update_idletasks()
-    width = 320
-    height = popup.winfo_reqheight()
-    popup.geometry(f"{width}x{height}")
 
+def sync_project_rows(projects):
+    # Adds/removes project rows only when the project list changed; returns True if it did
+    main_win_bg = "#61C4E9"
+    if list(projects) == shown_projects:
+        return False
 
-def on_project_click(project, reschedule_callback=None):
-    global sessions, current_project
-    now = datetime.now()
-    log_debug_event(f"Project clicked: {project} at {now.strftime('%H:%M:%S')}")
+    for project in [p for p in project_rows if p not in projects]:
+        project_rows.pop(project).destroy()
+        del project_buttons[project]
+        displayed_text.pop(project_time_labels.pop(project), None)
 
-    # Count how many sessions are finalized before switch
-    pre_finalized = [s for s in sessions if s.duration is not None]
+    for project in projects:
+        if project in project_rows:
+            project_rows[project].pack_forget()
+            continue
+        row = tk.Frame(project_frame, bg=main_win_bg)
+
+        btn = tk.Button(
+            row, text=project,
+            width=25, height=2,
+            bg="#f0f0f0",
+            command=lambda p=project: on_project_click(p, popup_reschedule)
+        )
+        btn.pack(side="left")
+
+        time_lbl = tk.Label(row, text="00:00:00", font=("Arial", 10), bg=main_win_bg)
+        time_lbl.pack(side="left", padx=10)
+
+        project_rows[project] = row
+        project_buttons[project] = btn
+        project_time_labels[project] = time_lbl
+
+    # Repack so the rows follow the project list order
+    for project in projects:
+        project_rows[project].pack(pady=3)
+
+    shown_projects[:] = projects
+    log_debug_event("Popup project rows updated: %s", shown_projects)
+    return True
+
+
+def highlight_current_project():
+    for proj, btn in project_buttons.items():
+        btn.config(bg="#00FF00" if proj == current_project else "#f0f0f0")
 
-    # Switch to the new project (this may finalize one session and append one)
-    sessions = switch_project(sessions, project)
 
-    # Compare finalized sessions after switching
-    post_finalized = [s for s in sessions if s.duration is not None]
-    if len(post_finalized) > len(pre_finalized):
-        new_finalized = post_finalized[len(pre_finalized):]
-        save_sessions(new_finalized)
-        log_debug_event(f"Saved {len(new_finalized)} finalized session(s): {[s.project for s in new_finalized]}")
+def on_project_click(project, reschedule_callback=None):
+    global current_project
+    now = datetime.now()
+    log_debug_event("Project clicked: %s at %s", project, now.strftime('%H:%M:%S'))
+
+    # Switch to the new project (this finalizes and queues the previous session, if any)
+    finalized = repo.switch_project(project)
+    if finalized:
+        log_debug_event("Queued finalized session for saving: %s", finalized.project)
     else:
         log_debug_event("No finalized session — nothing written.")
+    journal.start(project, repo.active.start_time, unsaved=writer.pending())
 
     current_project = project
     if status_label:
-        status_label.config(text=f"Last logged: {current_project} at {now.strftime('%H:%M:%S')}")
+        set_label_text(status_label, f"Last logged: {current_project} at {now.strftime('%H:%M:%S')}")
 
     if reschedule_callback:
         reschedule_callback()
 
-    for proj, btn in project_buttons.items():
-        btn.config(bg="#00FF00" if proj == project else "#f0f0f0")
+    highlight_current_project()
 
-    popup.iconify()
+    if popup and popup.winfo_exists():
+        popup.iconify()
 
 
 def on_interval_change(new_value, reschedule_callback=None):
     global INTERVAL, selected_interval
     selected_interval = new_value
     INTERVAL = INTERVAL_OPTIONS.get(selected_interval, INTERVAL_OPTIONS[DEFAULT_INTERVAL])
-    log_debug_event(f"Interval changed to {selected_interval}")
+    log_debug_event("Interval changed to %s", selected_interval)
     if reschedule_callback:
         reschedule_callback(selected_interval)
 
 
+def set_label_text(label, text):
+    # Skips the Tk reconfigure when the label already shows this text
+    if displayed_text.get(label) != text:
+        label.config(text=text)
+        displayed_text[label] = text
+
+
+@timed("update_ui")
 def update_ui():
-    global update_ui_handle
-    totals = compute_totals(sessions)
+    totals = repo.index.totals()
     total_all = sum(totals.values())
 
     for project, label in project_time_labels.items():
-        label.config(text=format_seconds(totals.get(project, 0)))
+        set_label_text(label, format_seconds(totals.get(project, 0)))
 
     if total_time_label:
-        total_time_label.config(text=f"Total time logged today: {format_seconds(total_all)}", font=("Arial", 10))
+        set_label_text(total_time_label, f"Total time logged today: {format_seconds(total_all)}")
 
-    update_ui_handle = popup.after(1000, update_ui)
+
+def checkpoint_tick():
+    # Runs whether or not the popup is showing, so crash recovery and save errors don't wait for it
+    journal.checkpoint()
+    show_write_errors()
+
+
+# === Local HTTP API (api_server.py); the api_* functions are called on the Tk thread ===
+
+def start_api():
+    global api
+    api = ApiServer(get_root(), today=api_today, history=api_history, switch=api_switch,
+                    version=lambda: repo.version, host=API_HOST, port=API_PORT, refresh_secs=API_REFRESH_SECS)
+    if not api.start():
+        api = None
+
+
+def api_today():
+    # Today's totals as of now, which the server carries forward for the active project
+    load_today_sessions()
+    now = datetime.now()
+    active = repo.active
+    return {"version": repo.version, "taken": now, "project": active.project if active else None,
+            "since": active.start_time if active else None, "totals": repo.index.totals(now=now)}
+
+
+def api_switch(project):
+    if project not in load_projects():
+        raise ApiError(404, f"no project named {project!r}")
+    load_today_sessions()
+    on_project_click(project, popup_reschedule)
+    return {"project": project, "since": repo.active.start_time.isoformat(timespec="seconds")}
+
+
+def api_history():
+    # Closed totals of every day, sorted by date, for the server's range summaries
+    per_day = {}
+    for (day, project), seconds in repo.daily_totals().items():
+        per_day.setdefault(day, {})[project] = seconds
+    days = sorted(per_day)
+    return {"version": repo.version, "taken": datetime.now(), "days": days, "totals": [per_day[day] for day in days]}
@@ -0,0 +1,111 @@
+# journal.py
+import csv
+import os
+import time
+from datetime import datetime
+from typing import List, Optional, Sequence
+from models import Session
+from config import JOURNAL_FILE, JOURNAL_SYNC_SECS
+
+
+class SessionJournal:
+    """Heartbeat journal for the active (not yet saved) session.
+
+    start() truncates the file and records the project and its start time, along with any closed
+    sessions the background writer has not saved yet; checkpoint() appends the current time.
+    Every write is flushed to the OS straight away, which is enough to survive the app itself
+    crashing, but fsync (needed to survive a power cut or OS crash) is coalesced to at most once
+    every sync_secs. At worst a crash therefore loses JOURNAL_CHECKPOINT_SECS of time, or
+    sync_secs if the machine went down with it.
+    """
+
+    def __init__(self, path: str = JOURNAL_FILE, sync_secs: float = JOURNAL_SYNC_SECS):
+        self.path = path
+        self.sync_secs = sync_secs
+        self.file = None
+        self.writer = None
+        self.last_sync = 0.0
+        self.dirty = False
+        # Measured cost, reported at End Workday
+        self.stats = {"writes": 0, "syncs": 0, "sync_secs": 0.0}
+
+    def _open(self, mode: str):
+        self.close()
+        self.file = open(self.path, mode, newline="")
+        self.writer = csv.writer(self.file)
+
+    def _write(self, row, force_sync=False):
+        self.writer.writerow(row)
+        self.file.flush()
+        self.stats["writes"] += 1
+        self.dirty = True
+        now = time.monotonic()
+        if force_sync or now - self.last_sync >= self.sync_secs:
+            self.sync(now)
+
+    def sync(self, now: Optional[float] = None):
+        if self.file and self.dirty:
+            t0 = time.perf_counter()
+            os.fsync(self.file.fileno())
+            self.stats["syncs"] += 1
+            self.stats["sync_secs"] += time.perf_counter() - t0
+            self.dirty = False
+        self.last_sync = now if now is not None else time.monotonic()
+
+    def _write_unsaved(self, unsaved: Sequence[Session]):
+        for s in unsaved:
+            self.writer.writerow(["closed", s.project, s.start_time.isoformat(), s.duration])
+
+    def start(self, project: str, start_time: datetime, unsaved: Sequence[Session] = ()):
+        # New active session; the start record is always synced since it is what recovery needs
+        self._open("w")
+        self._write_unsaved(unsaved)
+        self._write(["start", project, start_time.isoformat()], force_sync=True)
+
+    def checkpoint(self):
+        # Records that the active session is still running; the scheduler calls this every
+        # JOURNAL_CHECKPOINT_SECS
+        if self.file:
+            self._write(["checkpoint", datetime.now().isoformat()])
+
+    def clear(self, unsaved: Sequence[Session] = ()):
+        # No active session; only closed sessions still waiting to be written are worth recovering
+        self._open("w")
+        self._write_unsaved(unsaved)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.close()
+
+    def close(self):
+        if self.file:
+            self.sync()
+            self.file.close()
+            self.file = None
+            self.writer = None
+
+
+def read_journal(path: str = JOURNAL_FILE) -> List[Session]:
+    # Sessions left behind by an interrupted run: closed ones that were never written, plus the
+    # active one ended at its last checkpoint. A torn final line from the crash is ignored.
+    try:
+        with open(path, newline="") as f:
+            rows = list(csv.reader(f))
+    except FileNotFoundError:
+        return []
+
+    recovered = []
+    project = start = end = None
+    for row in rows:
+        try:
+            if row[0] == "closed" and len(row) == 4:
+                recovered.append(Session(row[1], datetime.fromisoformat(row[2]), float(row[3])))
+            elif row[0] == "start" and len(row) == 3:
+                project, start = row[1], datetime.fromisoformat(row[2])
+                end = start
+            elif row[0] == "checkpoint" and len(row) == 2 and start is not None:
+                end = max(end, datetime.fromisoformat(row[1]))
+        except (IndexError, ValueError):
+            continue
+    if project is not None:
+        recovered.append(Session(project, start, (end - start).total_seconds()))
+    return recovered
@@ -1,48 +1,55 @@
 # __main__.py
-import tkinter as tk
-from datetime import date
-from gui import show_popup
-from storage import load_projects
-from config import INTERVAL_OPTIONS, DEFAULT_INTERVAL
+import logging
+import sys
+from tkinter.messagebox import showerror
+from gui import show_popup, get_root, scheduler, start_api
+from storage import load_projects, get_backend
+from config import INTERVAL_OPTIONS, DEFAULT_INTERVAL, API_ENABLED
 from utils import log_debug_event
 
-# Initialize the root window
-root = tk.Tk()
-root.withdraw()  # hide the base window
+# Shared (hidden) root window
+root = get_root()
 
 # Interval state
 selected_interval = DEFAULT_INTERVAL
 INTERVAL = INTERVAL_OPTIONS[selected_interval]
-popup_interval_handle = None  # for tracking/rescheduling
 
 # === Schedule pop-up function ===
 def schedule_popup():
-    global popup_interval_handle
-    log_debug_event(f"Popup timer triggered at interval: {INTERVAL // 1000}s")
+    log_debug_event("Popup timer triggered at interval: %ds", INTERVAL // 1000, level=logging.DEBUG)
     show_popup(load_projects(), reschedule_callback=reschedule_popup)
-    popup_interval_handle = root.after(INTERVAL, schedule_popup)
 
 
 # === Reschedule after interval change ===
 def reschedule_popup(new_interval_label=None):
-    global INTERVAL, popup_interval_handle, selected_interval
+    global INTERVAL, selected_interval
     if new_interval_label:
         selected_interval = new_interval_label
         INTERVAL = INTERVAL_OPTIONS.get(selected_interval, INTERVAL_OPTIONS[DEFAULT_INTERVAL])
-    if popup_interval_handle:
-        root.after_cancel(popup_interval_handle)
-    popup_interval_handle = root.after(INTERVAL, schedule_popup)
-    log_debug_event(f"Popup interval reset to {INTERVAL // 1000}s after interaction.")
+    scheduler.restart("popup", INTERVAL / 1000)
+    log_debug_event("Popup interval reset to %ds after interaction.", INTERVAL // 1000, level=logging.DEBUG)
 
 
 # === Entry point ===
 if __name__ == "__main__":
     log_debug_event("---- App Started ----")
 
+    # Settings that would hide saved history stop the app here rather than in the first popup
+    try:
+        get_backend()
+    except ValueError as e:
+        log_debug_event("Storage settings rejected: %s", e, level=logging.ERROR)
+        showerror("Timesheet Logger", str(e))
+        sys.exit(1)
+
     # Initial popup after a short delay
-    root.after(1000, lambda: show_popup(load_projects(), reschedule_callback=reschedule_popup))
+    scheduler.once("first_popup", 1, lambda: show_popup(load_projects(), reschedule_callback=reschedule_popup))
     
     # Schedule recurring popups
-    popup_interval_handle = root.after(INTERVAL, schedule_popup)
+    scheduler.every("popup", INTERVAL / 1000, schedule_popup)
+
+    # Local HTTP API for editor plugins and shell hooks
+    if API_ENABLED:
+        start_api()
 
     root.mainloop()
@@ -0,0 +1,120 @@
+# metrics.py
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Optional
+import config
+
+
+# Hot-path instrumentation: call counts, latency histograms and rows processed per named span,
+# dumped to METRICS_FILE on demand. With METRICS_ENABLED off, @timed returns the function untouched
+# and span() is a bare context manager, so instrumented code pays (almost) nothing.
+
+BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+_lock = threading.Lock()  # spans are recorded from the Tk thread and the session writer
+_spans = {}
+_captures = {}  # name -> "cprofile" | "tracemalloc", for the next call only
+
+
+def record(name: str, seconds: float, rows: Optional[int] = None):
+    ms = seconds * 1000
+    with _lock:
+        stats = _spans.get(name)
+        if stats is None:
+            stats = _spans[name] = {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0,
+                                    "histogram": [0] * (len(BUCKETS_MS) + 1)}
+        stats["calls"] += 1
+        stats["total_ms"] += ms
+        stats["max_ms"] = max(stats["max_ms"], ms)
+        if rows is not None:
+            stats["rows"] += rows
+        bucket = 0
+        while bucket < len(BUCKETS_MS) and ms > BUCKETS_MS[bucket]:
+            bucket += 1
+        stats["histogram"][bucket] += 1
+
+
+def timed(name: str, rows: Optional[Callable] = None):
+    """Decorator timing every call as span name; rows(args, result) counts the rows it processed."""
+    def decorate(fn):
+        if not config.METRICS_ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if name in _captures:
+                return _capture(name, _captures.pop(name), fn, args, kwargs)
+            t0 = time.perf_counter()
+            result = fn(*args, **kwargs)
+            record(name, time.perf_counter() - t0, rows(args, result) if rows else None)
+            return result
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def span(name: str):
+    if not config.METRICS_ENABLED:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - t0)
+
+
+def capture_next(name: str, mode: str = "cprofile"):
+    # Profile the next call of span name with cProfile, or trace its allocations with tracemalloc
+    if mode not in ("cprofile", "tracemalloc"):
+        raise ValueError(f"Unknown capture mode: {mode!r}")
+    _captures[name] = mode
+
+
+def _capture(name, mode, fn, args, kwargs):
+    base = os.path.splitext(config.METRICS_FILE)[0] + f".{name}"
+    t0 = time.perf_counter()
+    if mode == "cprofile":
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(fn, *args, **kwargs)
+        finally:
+            record(name, time.perf_counter() - t0)
+            profiler.dump_stats(base + ".prof")
+
+    import tracemalloc
+    tracemalloc.start()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        record(name, time.perf_counter() - t0)
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        with open(base + ".tracemalloc.txt", "w") as f:
+            f.write(f"current={current} peak={peak} bytes\n")
+            for stat in snapshot.statistics("lineno")[:25]:
+                f.write(f"{stat}\n")
+
+
+def snapshot() -> dict:
+    with _lock:
+        spans = {name: dict(stats, histogram=list(stats["histogram"])) for name, stats in _spans.items()}
+    for stats in spans.values():
+        stats["mean_ms"] = stats["total_ms"] / stats["calls"]
+        stats["histogram"] = {f"<={b}ms": n for b, n in zip(BUCKETS_MS, stats["histogram"])} | \
+                             {f">{BUCKETS_MS[-1]}ms": stats["histogram"][-1]}
+    return {"generated": datetime.now().isoformat(timespec="seconds"), "spans": spans}
+
+
+def dump_metrics(path: Optional[str] = None) -> str:
+    path = path or config.METRICS_FILE
+    with open(path, "w") as f:
+        json.dump(snapshot(), f, indent=2)
+    return path
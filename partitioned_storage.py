@@ -0,0 +1,169 @@
+# partitioned_storage.py
+import csv
+import os
+import re
+import shutil
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from models import Session
+from storage import StorageBackend, CsvStorage, SIDECARS, rebuild_sidecar, load_project_file, save_project_file
+
+
+# Partition files are named after the month ("2024-05.csv") or ISO week ("2024-W19.csv") their
+# rows start in. Both kinds are read back, so switching scheme never hides existing history.
+MONTH_NAME = re.compile(r"^(\d{4})-(\d{2})\.csv$")
+WEEK_NAME = re.compile(r"^(\d{4})-W(\d{2})\.csv$")
+
+
+def partition_key(start: str, scheme: str) -> str:
+    # start is an ISO timestamp string
+    if scheme == "week":
+        year, week, _ = date.fromisoformat(start[:10]).isocalendar()
+        return f"{year}-W{week:02d}"
+    return start[:7]
+
+
+def partition_span(filename: str) -> Optional[Tuple[date, date]]:
+    # First and last day covered by a partition file, or None if it isn't one
+    m = MONTH_NAME.match(filename)
+    if m:
+        first = date(int(m.group(1)), int(m.group(2)), 1)
+        return first, (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    m = WEEK_NAME.match(filename)
+    if m:
+        first = date.fromisocalendar(int(m.group(1)), int(m.group(2)), 1)
+        return first, first + timedelta(days=6)
+    return None
+
+
+class PartitionedCsvStorage(StorageBackend):
+    csv_logs = True
+
+    def __init__(self, session_dir: str, config_file: str, scheme: str = "month"):
+        if scheme not in ("month", "week"):
+            raise ValueError(f"Unknown partition scheme: {scheme!r}")
+        self.session_dir = session_dir
+        self.config_file = config_file
+        self.scheme = scheme
+
+    def _partition(self, key: str) -> CsvStorage:
+        return CsvStorage(os.path.join(self.session_dir, key + ".csv"), self.config_file)
+
+    def partitions(self, start_date: Optional[date] = None,
+                   end_date: Optional[date] = None) -> List[Tuple[date, date, str]]:
+        # (first day, last day, path) of each partition overlapping the range, oldest first
+        try:
+            names = os.listdir(self.session_dir)
+        except FileNotFoundError:
+            return []
+        found = []
+        for name in names:
+            span = partition_span(name)
+            if span is None:
+                continue
+            if (start_date is None or span[1] >= start_date) and (end_date is None or span[0] <= end_date):
+                found.append((span[0], span[1], os.path.join(self.session_dir, name)))
+        return sorted(found)
+
+    def watched_files(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[str]:
+        return [path for _, _, path in self.partitions(start_date, end_date)]
+
+    def _group(self, sessions: List[Session]) -> Dict[str, List[Session]]:
+        groups = {}
+        for s in sessions:
+            groups.setdefault(partition_key(s.start_time.isoformat(), self.scheme), []).append(s)
+        return groups
+
+    def save_sessions(self, new_sessions: List[Session]):
+        # Normally every row lands in the current partition; a session started before midnight
+        # at a month/week boundary goes to the partition its start belongs to
+        os.makedirs(self.session_dir, exist_ok=True)
+        for key, group in self._group([s for s in new_sessions if s.duration is not None]).items():
+            self._partition(key).save_sessions(group)
+
+    def overwrite_sessions(self, all_sessions: List[Session]):
+        for _, _, path in self.partitions():
+            _remove_log(path)
+        os.makedirs(self.session_dir, exist_ok=True)
+        for key, group in self._group(all_sessions).items():
+            self._partition(key).overwrite_sessions(group)
+
+    def iter_rows(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Iterator[Sequence]:
+        for first, last, path in self.partitions(start_date, end_date):
+            part = CsvStorage(path, self.config_file)
+            if (start_date is None or first >= start_date) and (end_date is None or last <= end_date):
+                yield from part.iter_rows()  # whole partition wanted: plain sequential read
+            else:
+                yield from part.iter_rows(start_date, end_date)
+
+    def load_daily_totals(self, start_date: Optional[date] = None,
+                          end_date: Optional[date] = None) -> Dict[Tuple[date, str], float]:
+        # A day can be in a month file and a week file after SESSION_PARTITION changed, so add up
+        totals = {}
+        for _, _, path in self.partitions(start_date, end_date):
+            for key, seconds in CsvStorage(path, self.config_file).load_daily_totals(start_date, end_date).items():
+                totals[key] = totals.get(key, 0) + seconds
+        return totals
+
+    def delete_sessions_before(self, day: date):
+        # Partitions that end before day are simply unlinked; at most one is rewritten
+        for first, last, path in self.partitions(end_date=day):
+            if last < day:
+                _remove_log(path)
+            elif first < day:
+                CsvStorage(path, self.config_file).delete_sessions_before(day)
+
+    def compact_adjustments(self) -> Tuple[int, int]:
+        rows = size = 0
+        for _, _, path in self.partitions():
+            r, b = CsvStorage(path, self.config_file).compact_adjustments()
+            rows += r
+            size += b
+        return rows, size
+
+    def load_projects(self) -> List[str]:
+        return load_project_file(self.config_file)
+
+    def save_projects(self, projects: List[str]):
+        save_project_file(self.config_file, projects)
+
+    def migrate_from_file(self, session_file: str) -> int:
+        """Splits a single-file session log into partitions and renames it to <file>.migrated.
+
+        Partitions are written to a scratch folder that only replaces session_dir once complete,
+        so an interrupted migration simply runs again on the next start.
+        """
+        tmp_dir = self.session_dir + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        files, writers, count = {}, {}, 0
+        try:
+            for row in CsvStorage(session_file, self.config_file).iter_rows():
+                if len(row) != 3:
+                    continue
+                key = partition_key(row[1], self.scheme)
+                if key not in writers:
+                    files[key] = open(os.path.join(tmp_dir, key + ".csv"), "w", newline="")
+                    writers[key] = csv.writer(files[key])
+                    writers[key].writerow(["Project", "Start", "Duration"])
+                writers[key].writerow(row)
+                count += 1
+        finally:
+            for f in files.values():
+                f.close()
+
+        for key in files:
+            for suffix in SIDECARS:
+                rebuild_sidecar(os.path.join(tmp_dir, key + ".csv"), suffix)
+        os.replace(tmp_dir, self.session_dir)
+        os.replace(session_file, session_file + ".migrated")
+        for suffix in SIDECARS:
+            if os.path.exists(session_file + suffix):
+                os.remove(session_file + suffix)
+        return count
+
+
+def _remove_log(path: str):
+    for p in [path] + [path + suffix for suffix in SIDECARS]:
+        if os.path.exists(p):
+            os.remove(p)
@@ -0,0 +1,174 @@
+# report.py
+"""Headless summary report: hours per project per day, as in View Summary.
+
+    python report.py --from 2025-01-01 --to 2025-03-31 --format json --workers 4
+
+Reads the saved session log (the active session is not included). Large CSV logs are
+split into line-aligned byte ranges that a process pool parses and totals in parallel.
+"""
+import argparse
+import concurrent.futures
+import csv
+import io
+import json
+import os
+import sys
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import storage
+from storage import get_index, date_bounds
+from tracker import summary_pivot
+
+CHUNK_BYTES = 4 * 1024 * 1024  # ~40k rows per task
+Chunk = Tuple[str, int, int, str, str]  # (path, start, end, lo, hi)
+
+
+def _merge_spans(spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged = []
+    for start, end in sorted(spans):
+        if merged and merged[-1][1] == start:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _aligned(f, offset: int) -> int:
+    # First line start at or after offset
+    f.seek(offset - 1)
+    f.readline()
+    return f.tell()
+
+
+def chunk_ranges(path: str, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                 chunk_bytes: int = CHUNK_BYTES) -> List[Tuple[int, int]]:
+    """Byte ranges of whole lines covering the log's rows in the date range, each about chunk_bytes."""
+    with open(path, "rb") as f:
+        if start_date is None and end_date is None:
+            header_end = len(f.readline())
+            spans = [(header_end, os.fstat(f.fileno()).st_size)]
+        else:
+            # The date index narrows a range query to the byte spans of the days asked for
+            lo, hi = date_bounds(start_date, end_date)
+            spans = _merge_spans([tuple(r) for day, day_ranges in get_index(path).items()
+                                  if lo <= day <= hi for r in day_ranges])
+
+        chunks = []
+        for start, end in spans:
+            while end - start > chunk_bytes:
+                cut = _aligned(f, start + chunk_bytes)
+                if cut >= end:
+                    break
+                chunks.append((start, cut))
+                start = cut
+            if end > start:
+                chunks.append((start, end))
+        return chunks
+
+
+def _aggregate_chunk(chunk: Chunk) -> Dict[Tuple[str, str], float]:
+    # Runs in a worker process: {(iso date, project): seconds} for one byte range
+    path, start, end, lo, hi = chunk
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    totals = {}
+    for row in csv.reader(io.TextIOWrapper(io.BytesIO(data), newline="")):
+        if len(row) != 3 or not row[2]:
+            continue
+        day = row[1][:10]
+        if lo <= day <= hi:
+            key = (day, row[0])
+            totals[key] = totals.get(key, 0) + float(row[2])
+    return totals
+
+
+def log_files(start_date: Optional[date] = None, end_date: Optional[date] = None) -> Optional[List[str]]:
+    # CSV files of the configured backend that can hold rows in the range; None if it isn't CSV
+    backend = storage.get_backend()
+    if isinstance(backend, storage.CsvStorage):
+        return [backend.session_file] if os.path.exists(backend.session_file) else []
+    from partitioned_storage import PartitionedCsvStorage
+    if isinstance(backend, PartitionedCsvStorage):
+        return [path for _, _, path in backend.partitions(start_date, end_date)]
+    return None
+
+
+def parallel_daily_totals(paths: Sequence[str], start_date: Optional[date] = None, end_date: Optional[date] = None,
+                          workers: Optional[int] = None, chunk_bytes: int = CHUNK_BYTES) -> Dict[Tuple[date, str], float]:
+    """Seconds per (day, stored project token) across the given CSV logs, parsed in parallel chunks."""
+    lo, hi = date_bounds(start_date, end_date)
+    chunks = [(path, start, end, lo, hi) for path in paths
+              for start, end in chunk_ranges(path, start_date, end_date, chunk_bytes)]
+
+    totals = {}
+    if workers == 1 or len(chunks) <= 1:
+        _merge(totals, map(_aggregate_chunk, chunks))  # not worth starting a pool
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            _merge(totals, pool.map(_aggregate_chunk, chunks))
+    return totals
+
+
+def _merge(totals: Dict[Tuple[date, str], float], partials):
+    for partial in partials:
+        for (day, project), seconds in partial.items():
+            key = (date.fromisoformat(day), project)
+            totals[key] = totals.get(key, 0) + seconds
+
+
+def daily_totals(start_date: Optional[date] = None, end_date: Optional[date] = None,
+                 workers: Optional[int] = None, paths: Optional[Sequence[str]] = None) -> Dict[Tuple[date, str], float]:
+    paths = log_files(start_date, end_date) if paths is None else paths
+    if paths is None:
+        return storage.load_daily_totals(start_date, end_date)  # SQLite keeps its own rollup; the binary log sums itself
+    return storage.resolve_totals(parallel_daily_totals(paths, start_date, end_date, workers))
+
+
+def report_rows(totals: Dict[Tuple[date, str], float]) -> List[List]:
+    # The View Summary table as rows: header, one row per project, then the two totals
+    dates, projects, hours, total_all, total_no_break = summary_pivot(totals)
+    rows = [["Project"] + [d.isoformat() for d in dates]]
+    rows += [[project] + project_hours for project, project_hours in zip(projects, hours)]
+    rows.append(["TOTAL"] + total_all)
+    rows.append(["TOTAL (excl Breaks)"] + total_no_break)
+    return rows
+
+
+def write_report(totals: Dict[Tuple[date, str], float], out, fmt: str = "csv"):
+    if fmt == "json":
+        dates, projects, hours, total_all, total_no_break = summary_pivot(totals)
+        json.dump({
+            "dates": [d.isoformat() for d in dates],
+            "projects": dict(zip(projects, hours)),
+            "total": total_all,
+            "total_excl_breaks": total_no_break,
+        }, out, indent=2)
+        out.write("\n")
+    else:
+        csv.writer(out, lineterminator="\n").writerows(report_rows(totals))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--from", dest="start_date", type=date.fromisoformat, help="first day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end_date", type=date.fromisoformat, help="last day (YYYY-MM-DD)")
+    parser.add_argument("--format", choices=("csv", "json"), default="csv")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--log", action="append", help="report on this CSV log instead of the configured storage")
+    parser.add_argument("--out", help="write here instead of stdout")
+    args = parser.parse_args(argv)
+
+    totals = daily_totals(args.start_date, args.end_date, args.workers, args.log)
+    if not totals:
+        sys.exit("No session data found.")
+    if args.out:
+        with open(args.out, "w", newline="") as f:
+            write_report(totals, f, args.format)
+    else:
+        write_report(totals, sys.stdout, args.format)
+
+
+if __name__ == "__main__":
+    main()
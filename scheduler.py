@@ -0,0 +1,139 @@
+# scheduler.py
+import time
+from typing import Callable, Dict, Optional
+from utils import log_debug_event
+
+
+# One Tk after() handle for every timer in the app. Each wakeup runs the timers that are due plus
+# any due within their coalescing slack, then re-arms for the next deadline, so timers that fall
+# close together share a wakeup. Deadlines are wall-clock times advanced by whole intervals, so callback
+# and Tk lateness never accumulate. A deadline missed during system sleep fires once right after
+# resume instead of once per missed interval; waking at least every MAX_SLEEP_SECS also means a
+# wall clock that is set back is noticed and the deadlines moved with it.
+MAX_SLEEP_SECS = 60
+RESUME_GAP_SECS = 5  # a wakeup this much later (or earlier) than armed for means a sleep (or clock change)
+
+
+class Timer:
+    def __init__(self, callback: Callable, interval: Optional[float], due: float, visible_only: bool, slack: float):
+        self.callback = callback
+        self.interval = interval  # None for a one-shot timer
+        self.due = due
+        self.visible_only = visible_only
+        self.slack = slack
+
+
+class Scheduler:
+    def __init__(self, coalesce_secs: float = 2.0):
+        self.coalesce_secs = coalesce_secs
+        self.widget = None
+        self.handle = None
+        self.timers: Dict[str, Timer] = {}
+        self.visible = True
+        self.wake_at = None  # wall-clock time the pending after() was armed for
+        self.stats = {"wakeups": 0, "fired": {}, "coalesced": 0, "skipped": 0, "resumes": 0, "max_late_secs": 0.0}
+
+    def attach(self, widget):
+        # Timers added before this wait until there is a Tk widget to call after() on
+        self.widget = widget
+        self._arm()
+
+    # === Timers ===
+
+    def every(self, name: str, interval: float, callback: Callable, visible_only: bool = False, first: Optional[float] = None):
+        """Runs callback every interval seconds (first run after `first` seconds, default one interval).
+
+        visible_only timers are suspended while the window is hidden (see set_visible).
+        """
+        slack = min(self.coalesce_secs, interval / 4)
+        delay = interval if first is None else first
+        self.timers[name] = Timer(callback, interval, time.time() + delay, visible_only, slack)
+        self._arm()
+
+    def once(self, name: str, delay: float, callback: Callable):
+        self.timers[name] = Timer(callback, None, time.time() + delay, False, min(self.coalesce_secs, delay / 4))
+        self._arm()
+
+    def restart(self, name: str, interval: Optional[float] = None):
+        # Next run one (new) interval from now
+        timer = self.timers[name]
+        if interval is not None:
+            timer.interval = interval
+            timer.slack = min(self.coalesce_secs, interval / 4)
+        timer.due = time.time() + timer.interval
+        self._arm()
+
+    def cancel(self, name: str):
+        self.timers.pop(name, None)
+        self._arm()
+
+    def stop(self):
+        self.timers.clear()
+        self._arm()
+
+    def set_visible(self, visible: bool):
+        # Hidden windows need no label refreshes; becoming visible runs those timers straight away
+        if visible == self.visible:
+            return
+        self.visible = visible
+        if visible:
+            now = time.time()
+            for timer in self.timers.values():
+                if timer.visible_only:
+                    timer.due = now
+        self._arm()
+
+    # === Wakeups ===
+
+    def _active(self):
+        return [(name, t) for name, t in self.timers.items() if self.visible or not t.visible_only]
+
+    def _arm(self):
+        if self.widget is None:
+            return
+        if self.handle is not None:
+            self.widget.after_cancel(self.handle)
+            self.handle = None
+        active = self._active()
+        if not active:
+            return
+        delay = min(t.due for _, t in active) - time.time()
+        delay = max(0.0, min(delay, MAX_SLEEP_SECS))
+        self.wake_at = time.time() + delay
+        self.handle = self.widget.after(int(delay * 1000), self._wake)
+
+    def _wake(self):
+        self.handle = None
+        self.stats["wakeups"] += 1
+        now = time.time()
+        late = now - self.wake_at
+        if late > RESUME_GAP_SECS:
+            self.stats["resumes"] += 1
+            log_debug_event("Scheduler: woke %.0fs late (system sleep?).", late)
+        elif late < -RESUME_GAP_SECS:
+            log_debug_event("Scheduler: clock went back %.0fs; moving timers with it.", -late)
+            for timer in self.timers.values():
+                timer.due += late
+
+        due = [(name, t) for name, t in self._active() if t.due - t.slack <= now]
+        if len(due) > 1:
+            self.stats["coalesced"] += len(due) - 1
+        for name, timer in sorted(due, key=lambda item: item[1].due):
+            if self.timers.get(name) is not timer:
+                continue  # cancelled or replaced by an earlier callback in this wakeup
+            self.stats["max_late_secs"] = max(self.stats["max_late_secs"], now - timer.due)
+            if timer.interval is None:
+                del self.timers[name]
+            else:
+                timer.due += timer.interval
+                if timer.due <= now:
+                    # Missed whole intervals (sleep, a long block): run once and restart the cadence
+                    missed = int((now - timer.due) // timer.interval) + 1
+                    self.stats["skipped"] += missed
+                    timer.due += missed * timer.interval
+            self.stats["fired"][name] = self.stats["fired"].get(name, 0) + 1
+            try:
+                timer.callback()
+            except Exception as e:
+                log_debug_event("Scheduler: timer %s failed: %s", name, e)
+        self._arm()
@@ -0,0 +1,181 @@
+# session_index.py
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import accumulate, groupby
+from typing import Callable, Dict, Iterable, List, Optional
+from models import Session
+from session_table import to_wall_seconds
+
+
+class _Track:
+    """Closed sessions sorted by start, with running sums for range totals.
+
+    max_end[i] is the latest end among the first i + 1 sessions, so it never decreases and the
+    first session that can still be running at time t is found with one bisect.
+    """
+
+    def __init__(self):
+        self.starts: List[float] = []
+        self.ends: List[float] = []
+        self.cum: List[float] = [0.0]  # cum[i] = seconds in the first i sessions
+        self.max_end: List[float] = []
+        self.sessions: List[Session] = []
+
+    def add(self, session: Session, start: float):
+        end = start + session.duration
+        i = bisect_right(self.starts, start)
+        if i == len(self.starts):
+            # SessionRepository.switch_project only ever appends, so this is the usual case
+            self.starts.append(start)
+            self.ends.append(end)
+            self.cum.append(self.cum[-1] + session.duration)
+            self.max_end.append(max(end, self.max_end[-1]) if self.max_end else end)
+            self.sessions.append(session)
+            return
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.sessions.insert(i, session)
+        # An out-of-order insert (a recovered or back-dated session) redoes the sums after it
+        self.cum[i:] = accumulate((s.duration for s in self.sessions[i:]), initial=self.cum[i])
+        self.max_end[i:] = accumulate(self.ends[i:], max, initial=self.max_end[i - 1]) if i else accumulate(self.ends, max)
+        if i:
+            del self.max_end[i]  # the seed value accumulate() yields first
+
+    def live_from(self, t: float) -> int:
+        # Index of the first session that may still be running at t
+        return bisect_right(self.max_end, t)
+
+    def seconds_between(self, a: float, b: float) -> float:
+        # Sessions within one project never overlap, so at most the last one starting in
+        # [a, b) runs past b and only sessions from live_from(a) start before a but reach it
+        i, j = bisect_left(self.starts, a), bisect_left(self.starts, b)
+        total = self.cum[j] - self.cum[i]
+        if j > i:
+            total -= max(0.0, self.ends[j - 1] - b)
+        for k in range(self.live_from(a), i):
+            total += max(0.0, min(self.ends[k], b) - a)
+        return total
+
+
+class _Points:
+    # Adjustment rows from Edit Today's Log: time moved between projects, stamped at the edit
+    def __init__(self):
+        self.times: List[float] = []
+        self.cum: List[float] = [0.0]
+
+    def add(self, t: float, seconds: float):
+        i = bisect_right(self.times, t)
+        self.times.insert(i, t)
+        self.cum.insert(i + 1, self.cum[i] + seconds)
+        for k in range(i + 2, len(self.cum)):
+            self.cum[k] += seconds
+
+    def seconds_between(self, a: float, b: float) -> float:
+        return self.cum[bisect_left(self.times, b)] - self.cum[bisect_left(self.times, a)]
+
+
+class SessionIndex:
+    """Sessions indexed by time for range totals, point lookups and overlap queries.
+
+    Sums and lookups are O(log n) bisects over sorted starts and running sums, kept up to date as
+    sessions are added, so it doubles as the popup's running per-project totals. The active
+    session is held apart and counts up to `now`. Adjustment rows are not intervals; they count
+    towards a range total when their timestamp falls inside it.
+    """
+
+    def __init__(self, sessions: Iterable[Session] = ()):
+        self.reset(sessions)
+
+    def reset(self, sessions: Iterable[Session]):
+        self.timeline = _Track()  # every closed session, for point and overlap queries
+        self.tracks: Dict[str, _Track] = {}
+        self.adjustments: Dict[str, _Points] = {}
+        self.active: Optional[Session] = None
+        for _, group in groupby(sessions, key=lambda s: s.start_time):
+            group = list(group)
+            # Edit Today's Log writes rows sharing one start time whose durations cancel out
+            adjustment = len(group) > 1 and abs(sum(s.duration or 0 for s in group)) < 1e-6
+            for s in group:
+                if s.duration is None:
+                    self.active = s
+                else:
+                    self.add(s, adjustment)
+
+    def add(self, session: Session, adjustment: bool = False):
+        # A finalized session, or one side of an adjustment
+        start = to_wall_seconds(session.start_time)
+        if adjustment:
+            self.adjustments.setdefault(session.project, _Points()).add(start, session.duration)
+        else:
+            self.timeline.add(session, start)
+            self.tracks.setdefault(session.project, _Track()).add(session, start)
+
+    def set_active(self, session: Optional[Session]):
+        self.active = session
+
+    def __len__(self) -> int:
+        return len(self.timeline.starts) + (self.active is not None)
+
+    # === Queries ===
+
+    def _bounds(self, start: Optional[datetime], end: Optional[datetime], now: Optional[datetime]):
+        now = now or datetime.now()
+        a = to_wall_seconds(start) if start else float("-inf")
+        b = to_wall_seconds(end) if end else float("inf")
+        return a, b, now
+
+    def totals(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+               now: Optional[datetime] = None, resolve: Optional[Callable[[str], str]] = None) -> Dict[str, float]:
+        """Seconds per project booked between start and end (default: everything indexed).
+
+        resolve maps a session's project to the name to total it under, as in compute_totals.
+        """
+        a, b, now = self._bounds(start, end, now)
+        whole = start is None and end is None
+        totals = {}
+
+        def book(project, seconds):
+            if resolve:
+                project = resolve(project)
+            totals[project] = totals.get(project, 0) + seconds
+
+        # Projects with nothing in a narrower range are left out
+        for project, track in self.tracks.items():
+            seconds = track.cum[-1] if whole else track.seconds_between(a, b)
+            if whole or seconds:
+                book(project, seconds)
+        for project, points in self.adjustments.items():
+            seconds = points.cum[-1] if whole else points.seconds_between(a, b)
+            if whole or seconds:
+                book(project, seconds)
+        if self.active is not None:
+            active_start, active_end = to_wall_seconds(self.active.start_time), to_wall_seconds(now)
+            seconds = max(0.0, min(active_end, b) - max(active_start, a))
+            if seconds:
+                book(self.active.project, seconds)
+        return totals
+
+    def seconds_between(self, start: datetime, end: datetime, project: str, now: Optional[datetime] = None) -> float:
+        return self.totals(start, end, now).get(project, 0.0)
+
+    def at(self, moment: datetime, now: Optional[datetime] = None) -> Optional[Session]:
+        # The session that was running at moment, if any
+        now = now or datetime.now()
+        if self.active is not None and self.active.start_time <= moment <= now:
+            return self.active
+        t = to_wall_seconds(moment)
+        timeline = self.timeline
+        for k in range(bisect_right(timeline.starts, t) - 1, timeline.live_from(t) - 1, -1):
+            if timeline.ends[k] > t:
+                return timeline.sessions[k]
+        return None
+
+    def overlapping(self, start: datetime, end: datetime, now: Optional[datetime] = None) -> List[Session]:
+        # Sessions running at any point in [start, end), in start order
+        a, b, now = self._bounds(start, end, now)
+        timeline = self.timeline
+        found = [timeline.sessions[k] for k in range(timeline.live_from(a), bisect_left(timeline.starts, b))
+                 if timeline.ends[k] > a]
+        if self.active is not None and self.active.start_time < end and now > start:
+            found.append(self.active)
+        return found
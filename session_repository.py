@@ -0,0 +1,235 @@
+# session_repository.py
+import threading
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+import storage
+from models import Session
+from session_index import SessionIndex
+from session_writer import SessionWriter
+from tracker import finalize_sessions
+from utils import log_debug_event
+
+
+class _Cached:
+    # One cached read: the sessions of a date range, or the daily totals of the whole history
+    def __init__(self, start_date: Optional[date], end_date: Optional[date]):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.value = None
+        self.sigs: Dict[str, Optional[Tuple[int, int, int]]] = {}  # file signatures it matches
+        self.dirty = False  # files changed under a write of ours, so only a full re-read is safe
+
+    def covers(self, day: date) -> bool:
+        return (self.start_date is None or day >= self.start_date) and (self.end_date is None or day <= self.end_date)
+
+
+class SessionRepository:
+    """The GUI's single way in and out of storage: today's sessions (with the active one), the
+    summary's daily totals and any other date range, each cached in memory.
+
+    Writes update every cached range they fall in straight away and go to storage through the
+    background SessionWriter. A read is served from the cache unless the files behind it changed
+    since (inode, size or mtime). Changes made by our own writes are folded into the signatures,
+    so only an edit from outside the app forces a re-read. A CSV log that only grew
+    is read from where it ended; anything else re-reads the range.
+    """
+
+    def __init__(self):
+        self.writer = SessionWriter(self._save)
+        self.index = SessionIndex()  # today's sessions by time (running totals, range sums)
+        self.active: Optional[Session] = None
+        self.ranges: Dict[Tuple[Optional[date], Optional[date]], _Cached] = {}
+        self.totals: Optional[_Cached] = None
+        self.index_day = None  # the day the index holds; it is rebuilt when that changes or goes stale
+        self.index_stale = False
+        self.version = 0  # bumped whenever what today() or the cached ranges return may have changed
+        self.stats = {"hits": 0, "tail_reads": 0, "reloads": 0}
+        self._lock = threading.Lock()
+        self._saving = False
+
+    # === Reads ===
+
+    def sessions(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[Session]:
+        # Saved (and queued) sessions of an inclusive date range; don't modify the list
+        entry = self.ranges.get((start_date, end_date))
+        if entry is None:
+            entry = self.ranges[(start_date, end_date)] = _Cached(start_date, end_date)
+        self._refresh(entry)
+        return entry.value
+
+    def today(self) -> List[Session]:
+        # Today's sessions, the active one last
+        today = date.today()
+        closed = self.sessions(today, today)
+        if self.index_day != today or self.index_stale:
+            self._reindex(today)
+        return closed + [self.active] if self.active else list(closed)
+
+    def daily_totals(self) -> Dict[Tuple[date, str], float]:
+        # {(date, project): seconds} over the whole history, for the summary; don't modify it
+        if self.totals is None:
+            self.totals = _Cached(None, None)
+        self._refresh(self.totals)
+        return self.totals.value
+
+    def _refresh(self, entry: _Cached):
+        backend = storage.get_backend()
+        with self._lock:
+            if entry.value is not None and self._saving:
+                self.stats["hits"] += 1  # one of our writes is landing; the cache already has it
+                return
+            sigs = self._signatures(backend, entry)
+            if entry.value is not None and sigs == entry.sigs:
+                self.stats["hits"] += 1
+                return
+            grown = self._grown(entry, sigs) if entry.value is not None and backend.csv_logs and not entry.dirty else None
+            if grown is not None:
+                for path, offset in grown:
+                    self._fold(entry, storage.sessions_appended(path, offset, entry.start_date, entry.end_date))
+                entry.sigs = sigs
+                self.version += 1
+                self.stats["tail_reads"] += 1
+                log_debug_event("Read %d appended log file(s) changed outside the app.", len(grown))
+                return
+
+        # Re-read from storage, with anything still queued (not yet written) on top
+        self.writer.flush()
+        with self._lock:
+            sigs = self._signatures(backend, entry)
+        if entry is self.totals:
+            entry.value = storage.load_daily_totals()
+        else:
+            entry.value = storage.load_sessions(start_date=entry.start_date, end_date=entry.end_date)
+        entry.sigs, entry.dirty = sigs, False
+        self._fold(entry, self.writer.pending(), mark_index=False)
+        self.index_stale = True
+        self.version += 1
+        self.stats["reloads"] += 1
+
+    def _grown(self, entry: _Cached, sigs) -> Optional[List[Tuple[str, int]]]:
+        # (path, offset) to read from for each changed file, or None unless every change is an append
+        grown = []
+        for path, sig in sigs.items():
+            old = entry.sigs.get(path)
+            if sig == old:
+                continue
+            if old is None and sig is not None:
+                grown.append((path, 0))
+            elif sig is not None and sig[0] == old[0] and sig[1] > old[1]:
+                grown.append((path, old[1]))
+            else:
+                return None
+        return grown if sigs.keys() >= entry.sigs.keys() else None
+
+    def _fold(self, entry: _Cached, sessions: List[Session], mark_index: bool = True):
+        # Adds closed sessions (or adjustment rows) that belong to entry
+        for s in sessions:
+            if s.duration is None or not entry.covers(s.start_time.date()):
+                continue
+            if entry is self.totals:
+                if s.duration:
+                    key = (s.start_time.date(), s.project)
+                    entry.value[key] = entry.value.get(key, 0) + s.duration
+            else:
+                entry.value.append(s)
+        if mark_index and sessions:
+            self.index_stale = True
+
+    # === Writes ===
+
+    def add(self, sessions: List[Session], adjustment: bool = False):
+        # Write-through of closed sessions or an adjustment group: cached ranges now, storage soon
+        with self._lock:
+            for entry in self._entries():
+                if entry.value is not None:
+                    self._fold(entry, sessions, mark_index=False)
+        if self.index_day is not None:
+            for s in sessions:
+                if s.start_time.date() == self.index_day:
+                    self.index.add(s, adjustment)
+        self.version += 1
+        self.writer.submit(sessions)
+
+    def switch_project(self, project: str) -> Optional[Session]:
+        # Closes the active session (saving it) and starts one on project; returns the closed one
+        closed = self.finish()
+        self.active = Session(project, datetime.now())
+        self.index.set_active(self.active)
+        self.version += 1
+        return closed
+
+    def finish(self) -> Optional[Session]:
+        # Closes and saves the active session, if any
+        closed = finalize_sessions([self.active]) if self.active else []
+        self.active = None
+        self.index.set_active(None)
+        self.add(closed)
+        return closed[0] if closed else None
+
+    def _save(self, batch: List[Session]):
+        # Runs on the writer thread. Ranges that were in step with their files before the write
+        # take on the files' new signatures; the others can no longer trust a tail read.
+        backend = storage.get_backend()
+        with self._lock:
+            self._saving = True
+            entries = [e for e in self._entries() if e.value is not None]
+            in_step = [e for e in entries if self._signatures(backend, e) == e.sigs]
+        try:
+            storage.save_sessions(batch)
+        finally:
+            with self._lock:
+                for entry in entries:
+                    if entry in in_step:
+                        entry.sigs = self._signatures(backend, entry)
+                    else:
+                        entry.dirty = True
+                self._saving = False
+
+    # === Maintenance ===
+
+    def rename_projects(self):
+        # Brings cached names in line with renamed or merged projects
+        name = storage.project_name
+        with self._lock:
+            for entry in self.ranges.values():
+                for s in entry.value or ():
+                    s.project = name(s.project)
+            if self.totals is not None and self.totals.value is not None:
+                self.totals.value = storage.resolve_totals(self.totals.value)
+        if self.active:
+            self.active.project = name(self.active.project)
+        if self.index_day is not None:
+            self._reindex(self.index_day)
+        self.version += 1
+
+    def delete_sessions_before(self, day: date):
+        self.writer.flush()
+        storage.delete_sessions_before(day)
+        self.invalidate()
+
+    def compact_adjustments(self) -> Tuple[int, int]:
+        self.writer.flush()
+        result = storage.compact_adjustments()
+        self.invalidate()
+        return result
+
+    def invalidate(self):
+        # After rewriting storage ourselves: everything is read again on next use
+        with self._lock:
+            self.ranges.clear()
+            self.totals = None
+        self.index_day = None
+        self.version += 1
+
+    def _reindex(self, day: date):
+        entry = self.ranges.get((day, day))
+        self.index.reset(entry.value if entry is not None and entry.value is not None else [])
+        self.index.set_active(self.active)
+        self.index_day, self.index_stale = day, False
+
+    def _entries(self) -> List[_Cached]:
+        return list(self.ranges.values()) + ([self.totals] if self.totals else [])
+
+    @staticmethod
+    def _signatures(backend, entry: _Cached):
+        return {path: storage.file_signature(path) for path in backend.watched_files(entry.start_date, entry.end_date)}
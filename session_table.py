@@ -0,0 +1,214 @@
+# session_table.py
+import array
+from datetime import date, datetime, timedelta
+from typing import Callable, Collection, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from models import Session
+from tracker import pivot_from_seconds, summary_pivot
+
+try:
+    import numpy as np
+except ImportError:  # optional: without numpy the same operations run as plain loops
+    np = None
+
+
+# Start times are wall-clock seconds since 1970-01-01 (naive local time, like the log), so
+# start // DAY is the session's calendar day with no timezone or DST handling involved.
+EPOCH = datetime(1970, 1, 1)
+DAY = 86400
+EPOCH_ORDINAL = EPOCH.toordinal()
+
+
+def to_wall_seconds(dt: datetime) -> float:
+    return (dt - EPOCH).total_seconds()
+
+
+def from_wall_seconds(seconds: float) -> datetime:
+    return EPOCH + timedelta(seconds=seconds)
+
+
+def _day(day_number: int) -> date:
+    return date.fromordinal(EPOCH_ORDINAL + int(day_number))
+
+
+class SessionTable:
+    """Sessions stored column-wise: start seconds, durations (NaN while running) and project IDs.
+
+    Each session costs 20 bytes in three flat arrays instead of a Session object, a datetime
+    and a project string reference. Project names are interned in self.projects.
+    """
+
+    def __init__(self, projects: Sequence[str] = ()):
+        self.starts = array.array("d")
+        self.durations = array.array("d")
+        self.project_ids = array.array("i")
+        self.projects = list(projects)
+        self._ids = {project: i for i, project in enumerate(self.projects)}
+
+    # === Building ===
+
+    def project_id(self, project: str) -> int:
+        pid = self._ids.get(project)
+        if pid is None:
+            pid = self._ids[project] = len(self.projects)
+            self.projects.append(project)
+        return pid
+
+    def append(self, project: str, start_time: datetime, duration: Optional[float] = None):
+        self.starts.append(to_wall_seconds(start_time))
+        self.durations.append(float("nan") if duration is None else duration)
+        self.project_ids.append(self.project_id(project))
+
+    @classmethod
+    def from_sessions(cls, sessions: Iterable[Session]) -> "SessionTable":
+        table = cls()
+        for s in sessions:
+            table.append(s.project, s.start_time, s.duration)
+        return table
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence]) -> "SessionTable":
+        # Raw (project, start, duration) rows, as yielded by storage.filter_rows
+        table = cls()
+        starts, durations, project_ids = table.starts, table.durations, table.project_ids
+        ids, project_id = table._ids, table.project_id
+        nan, parse = float("nan"), datetime.fromisoformat
+        for project, start, duration in rows:
+            starts.append((parse(start) - EPOCH).total_seconds())
+            durations.append(float(duration) if duration else nan)
+            project_ids.append(ids[project] if project in ids else project_id(project))
+        return table
+
+    def rename_projects(self, rename: Callable[[str], str]):
+        # Maps every project name through rename; names that end up equal share one ID
+        names = [rename(project) for project in self.projects]
+        ids = {}
+        remap = [ids.setdefault(name, len(ids)) for name in names]
+        if remap != list(range(len(remap))):
+            if np is not None:
+                new_ids = np.asarray(remap, dtype=np.int32)[self._columns()[2]]
+                self.project_ids = array.array("i")
+                self.project_ids.frombytes(new_ids.tobytes())
+            else:
+                self.project_ids = array.array("i", (remap[pid] for pid in self.project_ids))
+        self.projects = list(ids)
+        self._ids = ids
+
+    def _from_columns(self, starts, durations, project_ids) -> "SessionTable":
+        # New table over the given columns (arrays, numpy arrays or lists) sharing this project list
+        table = SessionTable(self.projects)
+        if np is not None and isinstance(starts, np.ndarray):
+            table.starts.frombytes(starts.astype(np.float64).tobytes())
+            table.durations.frombytes(durations.astype(np.float64).tobytes())
+            table.project_ids.frombytes(project_ids.astype(np.int32).tobytes())
+        else:
+            table.starts.extend(starts)
+            table.durations.extend(durations)
+            table.project_ids.extend(project_ids)
+        return table
+
+    # === Access ===
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._from_columns(self.starts[index], self.durations[index], self.project_ids[index])
+        duration = self.durations[index]
+        return Session(self.projects[self.project_ids[index]], from_wall_seconds(self.starts[index]),
+                       None if duration != duration else duration)
+
+    def __iter__(self) -> Iterator[Session]:
+        return (self[i] for i in range(len(self)))
+
+    def to_sessions(self) -> List[Session]:
+        return list(self)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(col.itemsize * len(col) for col in (self.starts, self.durations, self.project_ids))
+
+    def _columns(self):
+        # Zero-copy numpy views of the three arrays
+        return (np.frombuffer(self.starts, dtype=np.float64),
+                np.frombuffer(self.durations, dtype=np.float64),
+                np.frombuffer(self.project_ids, dtype=np.int32))
+
+    # === Filtering ===
+
+    def _select(self, keep) -> "SessionTable":
+        if np is not None:
+            starts, durations, project_ids = self._columns()
+            mask = keep(starts, project_ids)
+            return self._from_columns(starts[mask], durations[mask], project_ids[mask])
+        rows = [i for i in range(len(self)) if keep(self.starts[i], self.project_ids[i])]
+        return self._from_columns([self.starts[i] for i in rows], [self.durations[i] for i in rows],
+                                  [self.project_ids[i] for i in rows])
+
+    def between(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> "SessionTable":
+        """Sessions starting on start_date..end_date, both inclusive."""
+        lo = to_wall_seconds(datetime.combine(start_date, datetime.min.time())) if start_date else float("-inf")
+        hi = to_wall_seconds(datetime.combine(end_date + timedelta(days=1), datetime.min.time())) if end_date else float("inf")
+        return self._select(lambda starts, _: (starts >= lo) & (starts < hi))
+
+    def for_projects(self, projects: Collection[str]) -> "SessionTable":
+        wanted = [self._ids[p] for p in projects if p in self._ids]
+        if np is not None:
+            return self._select(lambda _, ids: np.isin(ids, wanted))
+        wanted = set(wanted)
+        return self._select(lambda _, pid: pid in wanted)
+
+    # === Aggregation (running sessions, with a NaN duration, are left out) ===
+
+    def sum_by_project(self) -> Dict[str, float]:
+        if np is not None:
+            _, durations, project_ids = self._columns()
+            done = ~np.isnan(durations)
+            sums = np.bincount(project_ids[done], weights=durations[done], minlength=len(self.projects))
+            used = np.bincount(project_ids[done], minlength=len(self.projects))
+            return {self.projects[i]: float(sums[i]) for i in np.flatnonzero(used)}
+        totals = {}
+        for pid, duration in zip(self.project_ids, self.durations):
+            if duration == duration:
+                project = self.projects[pid]
+                totals[project] = totals.get(project, 0) + duration
+        return totals
+
+    def _grouped(self):
+        # (day numbers, project ids, seconds) for each (day, project) group, keyed as day * projects + id
+        starts, durations, project_ids = self._columns()
+        done = ~np.isnan(durations)
+        days = np.floor_divide(starts[done], DAY).astype(np.int64)
+        keys = days * len(self.projects) + project_ids[done]
+        keys, inverse = np.unique(keys, return_inverse=True)
+        sums = np.bincount(inverse, weights=durations[done])
+        return keys // len(self.projects), keys % len(self.projects), sums
+
+    def daily_totals(self) -> Dict[Tuple[date, str], float]:
+        """Seconds per (day, project), the shape storage.load_daily_totals returns."""
+        if np is not None:
+            days, pids, sums = self._grouped()
+            days, pids = days.tolist(), pids.tolist()
+            dates = {day: _day(day) for day in set(days)}
+            return {(dates[d], self.projects[p]): s for d, p, s in zip(days, pids, sums.tolist())}
+        sums = {}
+        for start, duration, pid in zip(self.starts, self.durations, self.project_ids):
+            if duration == duration:
+                key = (start // DAY, pid)
+                sums[key] = sums.get(key, 0) + duration
+        dates = {day: _day(day) for day, _ in sums}
+        return {(dates[day], self.projects[pid]): seconds for (day, pid), seconds in sums.items()}
+
+    def pivot(self):
+        """The View Summary table for these sessions; same result as tracker.summary_pivot."""
+        if np is None or not len(self):
+            return summary_pivot(self.daily_totals())
+        days, pids, sums = self._grouped()
+        day_numbers, columns = np.unique(days, return_inverse=True)
+        used = sorted(set(pids.tolist()), key=lambda pid: self.projects[pid])
+        row_of = np.zeros(len(self.projects), dtype=np.int64)
+        row_of[used] = np.arange(len(used))
+        seconds = np.zeros((len(used), len(day_numbers)))
+        seconds[row_of[pids], columns] = sums  # one group per (day, project), so no cell is hit twice
+        return pivot_from_seconds([_day(d) for d in day_numbers.tolist()],
+                                  [self.projects[pid] for pid in used], seconds.tolist())
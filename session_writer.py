@@ -0,0 +1,98 @@
+# session_writer.py
+import queue
+import threading
+import time
+from typing import Callable, List, Optional
+from models import Session
+from storage import save_sessions
+
+RETRY_SECS = 5
+
+
+class SessionWriter:
+    """Persists sessions on a background thread so slow disks never block the Tk event loop.
+
+    Sessions are appended in the order they were submitted. Everything queued since the last
+    write goes out as one batch (one file open / one transaction). A failed batch stays queued and
+    is retried (every RETRY_SECS, or straight away on flush()); the exception is handed back to the
+    GUI through pop_errors(). Callers must flush() before reading sessions back from storage.
+    """
+
+    def __init__(self, save: Callable[[List[Session]], None] = save_sessions):
+        self._save = save
+        self._cond = threading.Condition()
+        self._pending = []  # submitted but not yet written, oldest first
+        self._failures = 0
+        self._stopping = False
+        self._thread = None
+        self._errors = queue.SimpleQueue()
+
+    def submit(self, sessions: List[Session]):
+        sessions = [s for s in sessions if s.duration is not None]
+        if not sessions:
+            return
+        with self._cond:
+            self._pending.extend(sessions)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="session-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def pending(self) -> List[Session]:
+        # Snapshot of what has not reached storage yet (e.g. for the crash journal)
+        with self._cond:
+            return list(self._pending)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        # Blocks until everything submitted so far is written. Returns False if a write fails
+        # (or the timeout expires) first; those sessions stay queued.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            failures = self._failures
+            self._cond.notify_all()  # cut short any retry back-off
+            while self._pending:
+                if self._failures != failures:
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: Optional[float] = None) -> bool:
+        flushed = self.flush(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return flushed
+
+    def pop_errors(self) -> List[Exception]:
+        errors = []
+        while True:
+            try:
+                errors.append(self._errors.get_nowait())
+            except queue.Empty:
+                return errors
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                batch = list(self._pending)
+            try:
+                self._save(batch)
+            except Exception as e:
+                self._errors.put(e)
+                with self._cond:
+                    self._failures += 1
+                    self._cond.notify_all()
+                    self._cond.wait(RETRY_SECS)
+                continue
+            with self._cond:
+                del self._pending[:len(batch)]
+                self._cond.notify_all()
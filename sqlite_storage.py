@@ -0,0 +1,165 @@
+# sqlite_storage.py
+import os
+import sqlite3
+import threading
+from datetime import date, timedelta
+from typing import Collection, Dict, Iterator, List, Optional, Sequence, Tuple
+from models import Session
+from storage import StorageBackend, DEFAULT_PROJECTS, row_to_session, checked_compaction
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    project TEXT NOT NULL,
+    start TEXT NOT NULL,
+    duration REAL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_start ON sessions(start);
+CREATE INDEX IF NOT EXISTS idx_sessions_project ON sessions(project);
+CREATE TABLE IF NOT EXISTS rollup (
+    day TEXT NOT NULL,
+    project TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    PRIMARY KEY (day, project)
+);
+CREATE TABLE IF NOT EXISTS projects (
+    position INTEGER PRIMARY KEY,
+    name TEXT NOT NULL
+);
+"""
+
+
+def _range_clause(start_date: Optional[date], end_date: Optional[date]):
+    # Start is stored as an ISO string, so date bounds become plain string comparisons on the index
+    clauses, params = [], []
+    if start_date is not None:
+        clauses.append("start >= ?")
+        params.append(start_date.isoformat())
+    if end_date is not None:
+        clauses.append("start < ?")
+        params.append((end_date + timedelta(days=1)).isoformat())
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+class SqliteStorage(StorageBackend):
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+        self.is_new = not os.path.exists(db_file)
+        self._local = threading.local()
+        self.conn.execute("PRAGMA journal_mode=WAL")  # stored in the database, so it holds for every connection
+        self.conn.executescript(SCHEMA)
+        if not self.conn.execute("SELECT EXISTS (SELECT 1 FROM rollup)").fetchone()[0]:
+            with self.conn:
+                self._rebuild_rollup()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # One connection per thread. Sessions are written from the background session writer while
+        # the Tk thread reads and saves projects; sharing a connection would mix up their implicit
+        # transactions (one thread's commit or rollback taking the other's rows with it). WAL lets
+        # the readers carry on while a write is in progress.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.db_file)
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def watched_files(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[str]:
+        # Commits land in the write-ahead log until SQLite checkpoints them into the database file
+        return [self.db_file, self.db_file + "-wal"]
+
+    def _rebuild_rollup(self):
+        self.conn.execute("DELETE FROM rollup")
+        self.conn.execute(
+            "INSERT INTO rollup (day, project, seconds) "
+            "SELECT substr(start, 1, 10), project, SUM(duration) FROM sessions WHERE duration != 0 GROUP BY 1, 2"
+        )
+
+    def save_sessions(self, new_sessions: List[Session]):
+        rows = [(s.project, s.start_time.isoformat(), s.duration) for s in new_sessions if s.duration is not None]
+        with self.conn:
+            self.conn.executemany("INSERT INTO sessions (project, start, duration) VALUES (?, ?, ?)", rows)
+            self.conn.executemany(
+                "INSERT INTO rollup (day, project, seconds) VALUES (substr(?2, 1, 10), ?1, ?3) "
+                "ON CONFLICT (day, project) DO UPDATE SET seconds = seconds + excluded.seconds",
+                [row for row in rows if row[2]]
+            )
+
+    def overwrite_sessions(self, all_sessions: List[Session]):
+        with self.conn:
+            self.conn.execute("DELETE FROM sessions")
+            self.conn.executemany(
+                "INSERT INTO sessions (project, start, duration) VALUES (?, ?, ?)",
+                [(s.project, s.start_time.isoformat(), s.duration) for s in all_sessions]
+            )
+            self._rebuild_rollup()
+
+    def iter_rows(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Iterator[Sequence]:
+        where, params = _range_clause(start_date, end_date)
+        return self.conn.execute(f"SELECT project, start, duration FROM sessions{where} ORDER BY id", params)
+
+    def iter_sessions(self, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                      projects: Optional[Collection[str]] = None, skip_adjustments: bool = False) -> Iterator[Session]:
+        if projects is not None and not skip_adjustments:
+            # Push the project filter into the query as well
+            where, params = _range_clause(start_date, end_date)
+            projects = list(projects)
+            where += (" AND " if where else " WHERE ") + f"project IN ({', '.join('?' * len(projects))})"
+            rows = self.conn.execute(f"SELECT project, start, duration FROM sessions{where} ORDER BY id",
+                                     params + projects)
+            return map(row_to_session, rows)
+        return super().iter_sessions(start_date, end_date, projects, skip_adjustments)
+
+    def load_daily_totals(self, start_date: Optional[date] = None,
+                          end_date: Optional[date] = None) -> Dict[Tuple[date, str], float]:
+        clauses, params = [], []
+        if start_date is not None:
+            clauses.append("day >= ?")
+            params.append(start_date.isoformat())
+        if end_date is not None:
+            clauses.append("day <= ?")
+            params.append(end_date.isoformat())
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        rows = self.conn.execute(f"SELECT day, project, seconds FROM rollup{where}", params)
+        return {(date.fromisoformat(day), project): seconds for day, project, seconds in rows}
+
+    def delete_sessions_before(self, day: date):
+        with self.conn:
+            self.conn.execute("DELETE FROM sessions WHERE start < ?", (day.isoformat(),))
+            self.conn.execute("DELETE FROM rollup WHERE day < ?", (day.isoformat(),))
+
+    def compact_adjustments(self) -> Tuple[int, int]:
+        counts = {}
+        rows = list(checked_compaction(self.iter_rows(), counts))
+        size_before = self._db_size()
+        with self.conn:
+            # Same transaction as the deletes, so readers see either the old or the compacted log
+            self.conn.execute("DELETE FROM sessions")
+            self.conn.executemany("INSERT INTO sessions (project, start, duration) VALUES (?, ?, ?)", rows)
+            self._rebuild_rollup()
+        self.conn.execute("VACUUM")
+        return counts.get("in", 0) - counts.get("out", 0), size_before - self._db_size()
+
+    def _db_size(self) -> int:
+        page_count = self.conn.execute("PRAGMA page_count").fetchone()[0]
+        return page_count * self.conn.execute("PRAGMA page_size").fetchone()[0]
+
+    def load_projects(self) -> List[str]:
+        projects = [name for (name,) in self.conn.execute("SELECT name FROM projects ORDER BY position")]
+        return projects or list(DEFAULT_PROJECTS)
+
+    def save_projects(self, projects: List[str]):
+        with self.conn:
+            self.conn.execute("DELETE FROM projects")
+            self.conn.executemany("INSERT INTO projects (name) VALUES (?)", [(p,) for p in projects])
+
+    def migrate_from(self, source: StorageBackend) -> int:
+        # One-shot import of another backend's history; a database that already holds sessions is left alone
+        if self.conn.execute("SELECT EXISTS (SELECT 1 FROM sessions)").fetchone()[0]:
+            return 0
+        sessions = source.load_sessions()
+        self.overwrite_sessions(sessions)
+        self.save_projects(source.load_projects())
+        self.is_new = False
+        return len(sessions)
@@ -1,65 +1,654 @@
 # storage.py
 import csv
+import io
+import itertools
+import json
+import math
 import os
+import threading
 from datetime import datetime, date
-from typing import List, Optional
+from typing import Collection, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from models import Session
+from metrics import timed
+import config
 from config import SESSION_FILE, CONFIG_FILE
 
 
-def save_sessions(new_sessions: List[Session]):
-    file_exists = os.path.exists(SESSION_FILE)
-    with open(SESSION_FILE, 'a', newline='') as f:
-        writer = csv.writer(f)
-        if not file_exists:
+# === Sidecar files ===
+# Derived data about a session log lives next to it in small JSON sidecar files:
+#   <log>.idx     maps each ISO date to the byte ranges of its rows, so single-day and
+#                 date-range loads can seek straight to the rows they need.
+#   <log>.rollup  seconds per (date, project), so the summary never has to re-read history.
+# A sidecar is JSON lines: the data, then one delta per append to the log since (merged in on
+# read), the last line recording the log size, mtime and trailing bytes it is up to date with.
+# An append therefore only writes its own delta, never the whole history. If the log has grown
+# by a plain append only the new tail is scanned, otherwise (or if the sidecar is missing or
+# corrupt) it is rebuilt from scratch; a read also rewrites it as one line once
+# SIDECAR_MAX_DELTAS deltas have piled up.
+
+SIDECAR_TAIL_BYTES = 64
+SIDECAR_MAX_DELTAS = 200
+
+
+def _scan_ranges(f, offset: int, ranges: Dict[str, List[List[int]]]):
+    # Index rows from byte offset to EOF. Start is always the second-to-last field and never
+    # contains a comma, so the date can be sliced out without decoding or parsing the row.
+    f.seek(offset)
+    if offset == 0:
+        offset += len(f.readline())  # header
+    for line in f:
+        end = offset + len(line)
+        fields = line.rsplit(b",", 2)
+        if len(fields) == 3:
+            day = fields[1][:10].decode("ascii", "replace")
+            day_ranges = ranges.setdefault(day, [])
+            if day_ranges and day_ranges[-1][1] == offset:
+                day_ranges[-1][1] = end
+            else:
+                day_ranges.append([offset, end])
+        offset = end
+
+
+def _scan_totals(f, offset: int, totals: Dict[str, Dict[str, float]]):
+    # Add every row from byte offset to EOF into totals, adjustment rows included
+    f.seek(offset)
+    text = io.TextIOWrapper(f, newline="")
+    reader = csv.reader(text)
+    if offset == 0:
+        next(reader, None)  # header
+    for row in reader:
+        if len(row) == 3 and row[2]:
+            _add_total(totals, row[1][:10], row[0], float(row[2]))
+    text.detach()
+
+
+def _add_total(totals: Dict[str, Dict[str, float]], day: str, project: str, seconds: float):
+    if seconds:
+        day_totals = totals.setdefault(day, {})
+        day_totals[project] = day_totals.get(project, 0) + seconds
+
+
+def _merge_ranges(ranges: Dict[str, List[List[int]]], delta: Dict[str, List[List[int]]]):
+    for day, day_ranges in delta.items():
+        into = ranges.setdefault(day, [])
+        for start, end in day_ranges:
+            if into and into[-1][1] == start:
+                into[-1][1] = end
+            else:
+                into.append([start, end])
+
+
+def _merge_totals(totals: Dict[str, Dict[str, float]], delta: Dict[str, Dict[str, float]]):
+    for day, day_totals in delta.items():
+        for project, seconds in day_totals.items():
+            _add_total(totals, day, project, seconds)
+
+
+SIDECARS = {  # suffix -> (scan rows from an offset into data, merge a delta into data)
+    ".idx": (_scan_ranges, _merge_ranges),
+    ".rollup": (_scan_totals, _merge_totals),
+}
+
+
+def _log_state(log_path: str) -> dict:
+    with open(log_path, "rb") as f:
+        st = os.fstat(f.fileno())
+        f.seek(max(0, st.st_size - SIDECAR_TAIL_BYTES))
+        tail = f.read()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "tail": tail.hex()}
+
+
+def _write_sidecar(log_path: str, suffix: str, data: dict):
+    # The whole data, then an empty delta carrying the log state, so the last line is always small
+    with open(log_path + suffix, "w") as f:
+        f.write(json.dumps({"data": data}) + "\n")
+        f.write(json.dumps({**_log_state(log_path), "data": {}}) + "\n")
+
+
+def _append_sidecar(log_path: str, suffix: str, delta: dict):
+    with open(log_path + suffix, "a") as f:
+        f.write(json.dumps({**_log_state(log_path), "data": delta}) + "\n")
+
+
+def _load_sidecar(log_path: str, suffix: str) -> Optional[dict]:
+    # {"data", "deltas", and the log state of the last line}, or None if missing or corrupt
+    try:
+        with open(log_path + suffix) as f:
+            lines = [json.loads(line) for line in f]
+        data, state = lines[0]["data"], lines[-1]
+        merge = SIDECARS[suffix][1]
+        for delta in lines[1:]:
+            merge(data, delta["data"])
+        return {"size": state["size"], "mtime_ns": state["mtime_ns"], "tail": state["tail"],
+                "data": data, "deltas": len(lines) - 1}
+    except (OSError, ValueError, KeyError, TypeError, IndexError):
+        return None
+
+
+def _last_sidecar_state(log_path: str, suffix: str) -> Optional[dict]:
+    # The log state the sidecar is up to date with, read from its last line only
+    try:
+        with open(log_path + suffix, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            chunk = 4096
+            while True:
+                f.seek(max(0, size - chunk))
+                lines = f.read().splitlines()
+                if len(lines) > 1 or chunk >= size:
+                    break
+                chunk *= 4
+        return json.loads(lines[-1]) if lines else None
+    except (OSError, ValueError):
+        return None
+
+
+def rebuild_sidecar(log_path: str, suffix: str) -> dict:
+    data = {}
+    with open(log_path, "rb") as f:
+        SIDECARS[suffix][0](f, 0, data)
+    _write_sidecar(log_path, suffix, data)
+    return data
+
+
+def update_sidecars(log_path: str, before: Optional[os.stat_result]):
+    # After an append to log_path: adds just the new rows to sidecars that were up to date with
+    # the log as it was before (its stat, None if it was just created). Others are left for the
+    # next read to catch up.
+    for suffix, (scan, _) in SIDECARS.items():
+        if before is None:
+            rebuild_sidecar(log_path, suffix)
+            continue
+        state = _last_sidecar_state(log_path, suffix)
+        if state is None or (state.get("size"), state.get("mtime_ns")) != (before.st_size, before.st_mtime_ns):
+            continue
+        delta = {}
+        with open(log_path, "rb") as f:
+            scan(f, before.st_size, delta)
+        _append_sidecar(log_path, suffix, delta)
+
+
+def get_sidecar(log_path: str, suffix: str) -> dict:
+    """Returns the sidecar's data for log_path, bringing a stale sidecar up to date first."""
+    try:
+        st = os.stat(log_path)
+    except FileNotFoundError:
+        return {}
+
+    sidecar = _load_sidecar(log_path, suffix)
+    if sidecar is None or sidecar["size"] > st.st_size:
+        return rebuild_sidecar(log_path, suffix)
+    data = sidecar["data"]
+    if sidecar["size"] == st.st_size:
+        if sidecar["mtime_ns"] != st.st_mtime_ns:
+            return rebuild_sidecar(log_path, suffix)
+        if sidecar["deltas"] > SIDECAR_MAX_DELTAS:
+            _write_sidecar(log_path, suffix, data)
+        return data
+
+    # Log has grown: only trust the sidecar if the bytes it ended on are still there
+    tail = bytes.fromhex(sidecar["tail"])
+    delta = {}
+    with open(log_path, "rb") as f:
+        f.seek(sidecar["size"] - len(tail))
+        appended = tail.endswith(b"\n") and f.read(len(tail)) == tail
+        if appended:
+            SIDECARS[suffix][0](f, sidecar["size"], delta)
+    if not appended:
+        return rebuild_sidecar(log_path, suffix)
+    SIDECARS[suffix][1](data, delta)
+    if sidecar["deltas"] >= SIDECAR_MAX_DELTAS:
+        _write_sidecar(log_path, suffix, data)
+    else:
+        _append_sidecar(log_path, suffix, delta)
+    return data
+
+
+def get_index(log_path: str = SESSION_FILE) -> Dict[str, List[List[int]]]:
+    # {iso date: [[start, end], ...]} byte ranges of each day's rows
+    return get_sidecar(log_path, ".idx")
+
+
+def get_rollup(log_path: str = SESSION_FILE) -> Dict[str, Dict[str, float]]:
+    # {iso date: {project: seconds}}
+    return get_sidecar(log_path, ".rollup")
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    # (inode, size, mtime) of a storage file, or None if it doesn't exist; any change means it was written
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+# === Row streaming ===
+# Backends yield raw (project, start, duration) rows; filtering happens on those, so rows that
+# are rejected never get a datetime or a Session allocated for them.
+
+def date_bounds(start_date: Optional[date], end_date: Optional[date]) -> Tuple[str, str]:
+    # ISO date strings compare in date order, so range checks can run on the raw Start field
+    return (start_date.isoformat() if start_date else "",
+            end_date.isoformat() if end_date else "9999-99-99")
+
+
+def is_adjustment_group(group: List[Sequence]) -> bool:
+    # Adjustments are written as rows sharing one Start timestamp whose durations cancel out
+    # (a -x/+x pair from Edit Today's Log); ordinary sessions never share a start time.
+    return len(group) > 1 and abs(sum(float(row[2] or 0) for row in group)) < 1e-6
+
+
+def filter_rows(rows: Iterable[Sequence], start_date: Optional[date] = None, end_date: Optional[date] = None,
+                projects: Optional[Collection[str]] = None, skip_adjustments: bool = False) -> Iterator[Sequence]:
+    lo, hi = date_bounds(start_date, end_date)
+    rows = (row for row in rows if len(row) == 3)
+    if skip_adjustments:
+        # Adjustment pairs span two projects, so they are dropped before the project filter
+        groups = (list(group) for _, group in itertools.groupby(rows, key=lambda row: row[1]))
+        rows = (row for group in groups if not is_adjustment_group(group) for row in group)
+    for row in rows:
+        if lo <= row[1][:10] <= hi and (projects is None or row[0] in projects):
+            yield row
+
+
+def row_to_session(row: Sequence) -> Session:
+    duration = row[2]
+    return Session(row[0], datetime.fromisoformat(row[1]), float(duration) if duration not in ("", None) else None)
+
+
+# === Adjustment compaction ===
+
+def _flush_day(kept: List[Sequence], net: Dict[str, List[float]], stamp: Optional[str]) -> Iterator[Sequence]:
+    yield from kept
+    for project, durations in net.items():
+        seconds = math.fsum(durations)
+        if abs(seconds) >= 1e-6:
+            yield project, stamp, seconds
+
+
+def compact_rows(rows: Iterable[Sequence]) -> Iterator[Sequence]:
+    # Folds each day's adjustment groups into a single correction group holding the net seconds
+    # per project, stamped with the day's last adjustment time. Every other row passes through
+    # unchanged and in order. Only one day's rows are buffered at a time.
+    day, kept, net, stamp = None, [], {}, None
+    rows = (row for row in rows if len(row) == 3)
+    for start, group in itertools.groupby(rows, key=lambda row: row[1]):
+        group = list(group)
+        if start[:10] != day:
+            yield from _flush_day(kept, net, stamp)
+            day, kept, net, stamp = start[:10], [], {}, None
+        if is_adjustment_group(group):
+            for project, _, duration in group:
+                net.setdefault(project, []).append(float(duration))
+            stamp = start
+        else:
+            kept.extend(group)
+    yield from _flush_day(kept, net, stamp)
+
+
+def _tally(rows: Iterable[Sequence], totals: Dict[Tuple[str, str], float], counts: Dict[str, int], key: str):
+    for row in rows:
+        counts[key] = counts.get(key, 0) + 1
+        if len(row) == 3 and row[2] not in ("", None):
+            k = (row[1][:10], row[0])
+            totals[k] = totals.get(k, 0) + float(row[2])
+        yield row
+
+
+def checked_compaction(rows: Iterable[Sequence], counts: Dict[str, int]) -> Iterator[Sequence]:
+    """compact_rows(), raising ValueError once exhausted if any day's per-project total moved.
+
+    counts receives the number of rows read ("in") and written ("out").
+    """
+    totals_in, totals_out = {}, {}
+    yield from _tally(compact_rows(_tally(rows, totals_in, counts, "in")), totals_out, counts, "out")
+    for key in totals_in.keys() | totals_out.keys():
+        if abs(totals_in.get(key, 0) - totals_out.get(key, 0)) > 1e-6:
+            raise ValueError(f"Compaction would change the total for {key[1]} on {key[0]}")
+
+
+def _write_row(writer, s: Session):
+    writer.writerow([
+        s.project,
+        s.start_time.isoformat(),
+        s.duration if s.duration is not None else ""
+    ])
+
+
+# === Storage backends ===
+# The module-level functions below delegate to the backend selected by config.STORAGE_BACKEND.
+
+DEFAULT_PROJECTS = ["Project A", "Project B", "Break"]
+
+
+class StorageBackend:
+    # True when watched_files() are CSV logs that only ever grow by appends between rewrites,
+    # so a file that got bigger can be read from where it ended (see sessions_appended)
+    csv_logs = False
+
+    def watched_files(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[str]:
+        # The files holding the sessions of a date range, for change detection
+        raise NotImplementedError
+
+    def save_sessions(self, new_sessions: List[Session]):
+        raise NotImplementedError
+
+    def overwrite_sessions(self, all_sessions: List[Session]):
+        raise NotImplementedError
+
+    def iter_rows(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Iterator[Sequence]:
+        # Raw (project, start, duration) rows in write order; backends may return rows outside
+        # the date range, which filter_rows drops
+        raise NotImplementedError
+
+    def iter_sessions(self, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                      projects: Optional[Collection[str]] = None, skip_adjustments: bool = False) -> Iterator[Session]:
+        rows = filter_rows(self.iter_rows(start_date, end_date), start_date, end_date, projects, skip_adjustments)
+        return map(row_to_session, rows)
+
+    def load_sessions(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[Session]:
+        return list(self.iter_sessions(start_date, end_date))
+
+    def load_table(self, start_date: Optional[date] = None, end_date: Optional[date] = None):
+        # Columnar SessionTable; rows go straight into its arrays without a Session per row
+        from session_table import SessionTable
+        return SessionTable.from_rows(filter_rows(self.iter_rows(start_date, end_date), start_date, end_date))
+
+    def load_daily_totals(self, start_date: Optional[date] = None,
+                          end_date: Optional[date] = None) -> Dict[Tuple[date, str], float]:
+        # Seconds per (day, project); backends override this with something cheaper than a full load
+        totals = {}
+        for s in self.iter_sessions(start_date, end_date):
+            if s.duration:
+                key = (s.start_time.date(), s.project)
+                totals[key] = totals.get(key, 0) + s.duration
+        return totals
+
+    def delete_sessions_before(self, day: date):
+        self.overwrite_sessions(self.load_sessions(start_date=day))
+
+    def compact_adjustments(self) -> Tuple[int, int]:
+        # Nets adjustment rows into per-day correction records; returns (rows removed, bytes removed)
+        raise NotImplementedError
+
+    def load_projects(self) -> List[str]:
+        raise NotImplementedError
+
+    def save_projects(self, projects: List[str]):
+        raise NotImplementedError
+
+
+class CsvStorage(StorageBackend):
+    csv_logs = True
+
+    def __init__(self, session_file: str = SESSION_FILE, config_file: str = CONFIG_FILE):
+        self.session_file = session_file
+        self.config_file = config_file
+
+    def watched_files(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[str]:
+        return [self.session_file]
+
+    def save_sessions(self, new_sessions: List[Session]):
+        file_exists = os.path.exists(self.session_file)
+        before = os.stat(self.session_file) if file_exists else None
+        with open(self.session_file, 'a', newline='') as f:
+            writer = csv.writer(f)
+            if not file_exists:
+                writer.writerow(["Project", "Start", "Duration"])
+            for s in new_sessions:
+                if s.duration is None:
+                    continue  # Skip unfinished sessions
+                _write_row(writer, s)
+        # Scans just the rows appended above
+        update_sidecars(self.session_file, before)
+
+    def overwrite_sessions(self, all_sessions: List[Session]):
+        with open(self.session_file, 'w', newline='') as f:
+            writer = csv.writer(f)
             writer.writerow(["Project", "Start", "Duration"])
-        for s in new_sessions:
-            if s.duration is None:
-                continue  # Skip unfinished sessions
-            writer.writerow([
-                s.project,
-                s.start_time.isoformat(),
-                s.duration if s.duration is not None else ""
-            ])
+            for s in all_sessions:
+                _write_row(writer, s)
+        for suffix in SIDECARS:
+            rebuild_sidecar(self.session_file, suffix)
 
+    def iter_rows(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Iterator[Sequence]:
+        if not os.path.exists(self.session_file):
+            return
+        if start_date is None and end_date is None:
+            with open(self.session_file, newline='') as f:
+                reader = csv.reader(f)
+                next(reader, None)  # header
+                yield from reader
+            return
 
-def overwrite_sessions(all_sessions: List[Session]):
-    with open(SESSION_FILE, 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(["Project", "Start", "Duration"])
-        for s in all_sessions:
-            writer.writerow([
-                s.project,
-                s.start_time.isoformat(),
-                s.duration if s.duration is not None else ""
-            ])
+        # Seek straight to the indexed byte ranges of the requested days
+        lo, hi = date_bounds(start_date, end_date)
+        ranges = sorted(tuple(r) for day, day_ranges in get_index(self.session_file).items()
+                        if lo <= day <= hi for r in day_ranges)
+        with open(self.session_file, "rb") as f:
+            for start, end in ranges:
+                f.seek(start)
+                yield from csv.reader(io.TextIOWrapper(io.BytesIO(f.read(end - start)), newline=""))
 
+    def compact_adjustments(self) -> Tuple[int, int]:
+        if not os.path.exists(self.session_file):
+            return 0, 0
 
-def load_projects():
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE) as f:
+        # Write the compacted log beside the original and only swap it in once the totals check out
+        counts = {}
+        tmp_file = self.session_file + ".tmp"
+        try:
+            with open(self.session_file, newline='') as src, open(tmp_file, 'w', newline='') as dst:
+                reader = csv.reader(src)
+                writer = csv.writer(dst)
+                writer.writerow(next(reader, ["Project", "Start", "Duration"]))
+                writer.writerows(checked_compaction(reader, counts))
+        except BaseException:
+            os.remove(tmp_file)
+            raise
+
+        size_before = os.path.getsize(self.session_file)
+        os.replace(tmp_file, self.session_file)
+        for suffix in SIDECARS:
+            rebuild_sidecar(self.session_file, suffix)
+        return counts.get("in", 0) - counts.get("out", 0), size_before - os.path.getsize(self.session_file)
+
+    def load_daily_totals(self, start_date: Optional[date] = None,
+                          end_date: Optional[date] = None) -> Dict[Tuple[date, str], float]:
+        lo, hi = date_bounds(start_date, end_date)
+        return {(date.fromisoformat(day), project): seconds
+                for day, day_totals in get_rollup(self.session_file).items() if lo <= day <= hi
+                for project, seconds in day_totals.items()}
+
+    def load_projects(self) -> List[str]:
+        return load_project_file(self.config_file)
+
+    def save_projects(self, projects: List[str]):
+        save_project_file(self.config_file, projects)
+
+
+def load_project_file(config_file: str) -> List[str]:
+    if os.path.exists(config_file):
+        with open(config_file) as f:
             return [line.strip() for line in f.readlines() if line.strip()]
-    return ["Project A", "Project B", "Break"]
+    return list(DEFAULT_PROJECTS)
 
 
-def save_projects(projects: list[str]):
-    with open(CONFIG_FILE, "w", newline="") as f:
+def save_project_file(config_file: str, projects: List[str]):
+    with open(config_file, "w", newline="") as f:
         f.write("\n".join(projects))
 
 
-def load_sessions(for_date: Optional[date] = None) -> List[Session]:
-    sessions = []
-    try:
-        with open(SESSION_FILE, newline='') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                project = row['Project']
-                start = datetime.fromisoformat(row['Start'])
-                duration = float(row['Duration']) if row['Duration'] else None
-
-                if for_date is None or start.date() == for_date:
-                    sessions.append(Session(project, start, duration))
-    except FileNotFoundError:
-        pass
+_backend = None
+
+
+def _csv_backend() -> StorageBackend:
+    from partitioned_storage import PartitionedCsvStorage, partition_span
+    if not config.SESSION_PARTITION:
+        # The single file was renamed to .migrated when it was split up; starting a fresh one would
+        # hide every partitioned session from summaries, reports and exports
+        if os.path.isdir(config.SESSION_DIR) and any(partition_span(name) for name in os.listdir(config.SESSION_DIR)):
+            raise ValueError(f"Session history is split into partitions under {config.SESSION_DIR}, but "
+                             f"SESSION_PARTITION is None. Set SESSION_PARTITION to \"month\" or \"week\" in "
+                             f"config.py to keep using it.")
+        return CsvStorage(config.SESSION_FILE, config.CONFIG_FILE)
+
+    backend = PartitionedCsvStorage(config.SESSION_DIR, config.CONFIG_FILE, config.SESSION_PARTITION)
+    if os.path.exists(config.SESSION_FILE) and not os.path.exists(config.SESSION_DIR):
+        backend.migrate_from_file(config.SESSION_FILE)
+    return backend
+
+
+def get_backend() -> StorageBackend:
+    global _backend
+    if _backend is None:
+        if config.STORAGE_BACKEND == "sqlite":
+            from sqlite_storage import SqliteStorage
+            _backend = SqliteStorage(config.SQLITE_FILE)
+            if _backend.is_new:
+                _backend.migrate_from(_csv_backend())
+        elif config.STORAGE_BACKEND == "binary":
+            from binary_storage import BinaryStorage
+            _backend = BinaryStorage(config.BINARY_LOG_FILE, config.CONFIG_FILE)
+            if _backend.is_new:
+                _backend.migrate_from(_csv_backend())
+        elif config.STORAGE_BACKEND == "csv":
+            _backend = _csv_backend()
+        else:
+            raise ValueError(f"Unknown storage backend: {config.STORAGE_BACKEND!r}")
+    return _backend
+
+
+def set_backend(backend: Optional[StorageBackend] = None):
+    # Swap in a backend (benchmarks, tools); None rebuilds it (and the catalog) from config on next use
+    global _backend, _catalog
+    _backend = backend
+    _catalog = None
+
+
+# === Project catalog ===
+# Backends store a "#<id>" token per row (or a plain name, in rows older than the catalog). The
+# functions below encode names on the way in and decode them on the way out, so callers only
+# ever see current project names.
+
+_catalog = None
+_catalog_lock = threading.Lock()  # the Tk and session writer threads may both load it first
+
+
+def get_catalog():
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                from catalog import ProjectCatalog
+                _catalog = ProjectCatalog.load(config.CATALOG_FILE, seed=get_backend().load_projects)
+    return _catalog
+
+
+def project_name(token: str) -> str:
+    # Cached lookup of a project's current name
+    return get_catalog().name(token)
+
+
+def _encode(sessions: List[Session]) -> List[Session]:
+    token = get_catalog().token
+    return [Session(token(s.project), s.start_time, s.duration) for s in sessions]
+
+
+def _decode(sessions: List[Session]) -> List[Session]:
+    name = get_catalog().name
+    for s in sessions:
+        s.project = name(s.project)
     return sessions
 
+
+def resolve_totals(totals: Dict[Tuple[date, str], float]) -> Dict[Tuple[date, str], float]:
+    # Re-keys {(day, stored project): seconds} by current name; merged projects add up
+    name = get_catalog().name
+    resolved = {}
+    for (day, project), seconds in totals.items():
+        key = (day, name(project))
+        resolved[key] = resolved.get(key, 0) + seconds
+    return resolved
+
+
+@timed("save_sessions", rows=lambda args, result: len(args[0]))
+def save_sessions(new_sessions: List[Session]):
+    get_backend().save_sessions(_encode(new_sessions))
+
+
+@timed("overwrite_sessions", rows=lambda args, result: len(args[0]))
+def overwrite_sessions(all_sessions: List[Session]):
+    get_backend().overwrite_sessions(_encode(all_sessions))
+
+
+def load_projects():
+    return get_catalog().active()
+
+
+def update_projects(edits: List[Tuple[Optional[str], str]]) -> List[str]:
+    # Applies a Manage Projects edit (see ProjectCatalog.apply_edits); returns the new project list.
+    # The backend's plain project list is kept as a copy for older versions of the app.
+    projects = get_catalog().apply_edits(edits)
+    get_backend().save_projects(projects)
+    return projects
+
+
+def save_projects(projects: list[str]):
+    update_projects([(name, name) for name in projects])
+
+
+@timed("load_sessions", rows=lambda args, result: len(result))
+def load_sessions(for_date: Optional[date] = None,
+                  start_date: Optional[date] = None,
+                  end_date: Optional[date] = None) -> List[Session]:
+    # for_date loads a single day; start_date/end_date load an inclusive range (either end may be open)
+    if for_date is not None:
+        start_date = end_date = for_date
+    return _decode(get_backend().load_sessions(start_date, end_date))
+
+
+@timed("load_session_table", rows=lambda args, result: len(result))
+def load_session_table(start_date: Optional[date] = None, end_date: Optional[date] = None):
+    # Compact alternative to load_sessions for long date ranges (see session_table.py)
+    table = get_backend().load_table(start_date, end_date)
+    table.rename_projects(project_name)
+    return table
+
+
+def iter_sessions(start_date: Optional[date] = None, end_date: Optional[date] = None,
+                  projects: Optional[Collection[str]] = None, skip_adjustments: bool = False) -> Iterator[Session]:
+    # Lazily yields sessions in write order. The date range is inclusive, projects limits the
+    # result to those names and skip_adjustments drops the rows written by Edit Today's Log.
+    catalog = get_catalog()
+    stored = catalog.tokens_for(projects) if projects is not None else None
+    for s in get_backend().iter_sessions(start_date, end_date, stored, skip_adjustments):
+        s.project = catalog.name(s.project)
+        if projects is None or s.project in projects:
+            yield s
+
+
+def load_daily_totals(start_date: Optional[date] = None,
+                      end_date: Optional[date] = None) -> Dict[Tuple[date, str], float]:
+    return resolve_totals(get_backend().load_daily_totals(start_date, end_date))
+
+
+def sessions_appended(log_path: str, offset: int, start_date: Optional[date] = None,
+                      end_date: Optional[date] = None) -> List[Session]:
+    # Sessions in the rows of a CSV log from byte offset to EOF (offset 0 skips the header)
+    with open(log_path, "rb") as f:
+        f.seek(offset)
+        reader = csv.reader(io.TextIOWrapper(f, newline=""))
+        if offset == 0:
+            next(reader, None)
+        return _decode([row_to_session(row) for row in filter_rows(reader, start_date, end_date)])
+
+
+def delete_sessions_before(day: date):
+    # Drops every session that started before day
+    get_backend().delete_sessions_before(day)
+
+
+def compact_adjustments() -> Tuple[int, int]:
+    # Nets each day's adjustment rows into correction records; returns (rows removed, bytes removed)
+    return get_backend().compact_adjustments()
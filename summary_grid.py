@@ -0,0 +1,175 @@
+# summary_grid.py
+import tkinter as tk
+import tkinter.font as tkfont
+from typing import List, Sequence, Tuple
+
+
+class _CellPool:
+    # Reusable (rectangle, text) canvas item pairs. Cells are re-positioned and re-labelled on
+    # every redraw instead of being created and destroyed as the view scrolls.
+    def __init__(self, canvas: tk.Canvas, tag: str):
+        self.canvas = canvas
+        self.tag = tag
+        self.items = []
+        self.used = 0
+
+    def reset(self):
+        self.used = 0
+
+    def place(self, x, y, w, h, text, bg, font, anchor="center", outline=""):
+        canvas = self.canvas
+        if self.used == len(self.items):
+            rect = canvas.create_rectangle(0, 0, 0, 0, width=1, tags=self.tag)
+            label = canvas.create_text(0, 0, tags=self.tag)
+            self.items.append((rect, label))
+        rect, label = self.items[self.used]
+        self.used += 1
+        canvas.coords(rect, x, y, x + w, y + h)
+        canvas.itemconfigure(rect, fill=bg, outline=outline or bg, state="normal")
+        tx = x + 4 if anchor == "w" else x + w / 2
+        canvas.coords(label, tx, y + h / 2)
+        canvas.itemconfigure(label, text=text, font=font, anchor=anchor, state="normal")
+
+    def hide_unused(self):
+        for rect, label in self.items[self.used:]:
+            self.canvas.itemconfigure(rect, state="hidden")
+            self.canvas.itemconfigure(label, state="hidden")
+
+
+class VirtualTable(tk.Frame):
+    """Scrollable grid that only draws the cells inside the viewport.
+
+    The header row, the row-label column and any footer rows (e.g. totals) stay pinned
+    while the body scrolls in both directions.
+    """
+
+    def __init__(self, master, row_labels: Sequence[str], col_labels: Sequence[str],
+                 values: List[List[float]], footer_rows: Sequence[Tuple[str, Sequence[float], str]] = (),
+                 bg="white", corner_label="", cell_width=84, row_height=24, max_width=900, max_height=400):
+        super().__init__(master, bg=bg)
+        self.row_labels = row_labels
+        self.col_labels = col_labels
+        self.values = values
+        self.footer_rows = footer_rows
+        self.bg = bg
+        self.corner_label = corner_label
+        self.cell_w = cell_width
+        self.row_h = row_height
+        self.x0 = 0  # scroll offsets into the body, in pixels
+        self.y0 = 0
+
+        self.font = tkfont.Font(family="Arial", size=10)
+        self.bold = tkfont.Font(family="Arial", size=10, weight="bold")
+        self.label_w = max([self.bold.measure(t) for t in [corner_label, *row_labels, *(f[0] for f in footer_rows)]] + [60]) + 12
+
+        full_w = self.label_w + len(col_labels) * self.cell_w
+        full_h = (1 + len(row_labels) + len(footer_rows)) * self.row_h
+        self.canvas = tk.Canvas(self, bg=bg, highlightthickness=0,
+                                width=min(full_w, max_width), height=min(full_h, max_height))
+        self.v_scroll = tk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.h_scroll = tk.Scrollbar(self, orient="horizontal", command=self.xview)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.v_scroll.grid(row=0, column=1, sticky="ns")
+        self.h_scroll.grid(row=1, column=0, sticky="ew")
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        # One pool per layer, so a pooled item keeps its stacking role however the visible cell
+        # counts change: body < header/footer cells < row labels < corner and footer labels
+        self.body_pool = _CellPool(self.canvas, "body")
+        self.edge_pool = _CellPool(self.canvas, "edge")
+        self.label_pool = _CellPool(self.canvas, "labels")
+        self.corner_pool = _CellPool(self.canvas, "corner")
+        self.pools = (self.body_pool, self.edge_pool, self.label_pool, self.corner_pool)
+
+        self.canvas.bind("<Configure>", lambda e: self.redraw())
+        self.canvas.bind("<MouseWheel>", lambda e: self._scroll("y", -e.delta // 120))
+        self.canvas.bind("<Shift-MouseWheel>", lambda e: self._scroll("x", -e.delta // 120))
+        self.canvas.bind("<Button-4>", lambda e: self._scroll("y", -1))
+        self.canvas.bind("<Button-5>", lambda e: self._scroll("y", 1))
+
+    # === Geometry ===
+    def _viewport(self):
+        w = self.canvas.winfo_width() or int(self.canvas["width"])
+        h = self.canvas.winfo_height() or int(self.canvas["height"])
+        view_w = max(0, w - self.label_w)
+        view_h = max(0, h - (1 + len(self.footer_rows)) * self.row_h)
+        return w, h, view_w, view_h
+
+    def _clamp(self):
+        _, _, view_w, view_h = self._viewport()
+        self.x0 = max(0, min(self.x0, len(self.col_labels) * self.cell_w - view_w))
+        self.y0 = max(0, min(self.y0, len(self.row_labels) * self.row_h - view_h))
+
+    # === Scrollbar protocol ===
+    def _moveto(self, axis, fraction):
+        full = len(self.col_labels) * self.cell_w if axis == "x" else len(self.row_labels) * self.row_h
+        setattr(self, axis + "0", int(float(fraction) * full))
+        self.redraw()
+
+    def _scroll(self, axis, steps, what="units"):
+        _, _, view_w, view_h = self._viewport()
+        unit = self.cell_w if axis == "x" else self.row_h
+        page = view_w if axis == "x" else view_h
+        delta = int(steps) * (page if what == "pages" else unit)
+        setattr(self, axis + "0", getattr(self, axis + "0") + delta)
+        self.redraw()
+
+    def xview(self, *args):
+        if args[0] == "moveto":
+            self._moveto("x", args[1])
+        else:
+            self._scroll("x", args[1], args[2])
+
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self._moveto("y", args[1])
+        else:
+            self._scroll("y", args[1], args[2])
+
+    # === Drawing ===
+    def redraw(self):
+        self._clamp()
+        w, h, view_w, view_h = self._viewport()
+        cw, rh, lw = self.cell_w, self.row_h, self.label_w
+        n_rows, n_cols = len(self.row_labels), len(self.col_labels)
+        body_top = rh
+        footer_top = body_top + min(view_h, n_rows * rh)
+
+        first_col = self.x0 // cw
+        last_col = min(n_cols, (self.x0 + view_w) // cw + 1)
+        first_row = self.y0 // rh
+        last_row = min(n_rows, (self.y0 + view_h) // rh + 1)
+
+        body, edge, labels, corner = self.pools
+        for pool in self.pools:
+            pool.reset()
+
+        for r in range(first_row, last_row):
+            y = body_top + r * rh - self.y0
+            row = self.values[r]
+            labels.place(0, y, lw, rh, self.row_labels[r], self.bg, self.bold, anchor="w")
+            for c in range(first_col, last_col):
+                body.place(lw + c * cw - self.x0, y, cw, rh, f"{row[c]:.2f}", "white", self.font, outline=self.bg)
+
+        for c in range(first_col, last_col):
+            x = lw + c * cw - self.x0
+            edge.place(x, 0, cw, rh, self.col_labels[c], self.bg, self.bold)
+            for i, (_, totals, colour) in enumerate(self.footer_rows):
+                edge.place(x, footer_top + i * rh, cw, rh, f"{totals[c]:.2f}", colour, self.font, outline=self.bg)
+
+        corner.place(0, 0, lw, rh, self.corner_label, self.bg, self.bold)
+        for i, (label, _, colour) in enumerate(self.footer_rows):
+            corner.place(0, footer_top + i * rh, lw, rh, label, colour, self.bold, anchor="w")
+
+        for pool in self.pools:
+            pool.hide_unused()
+        # Raised in order, so partly scrolled header, footer and row-label cells slide under
+        # the corner and footer labels, and all of them cover the body
+        for pool in self.pools[1:]:
+            self.canvas.tag_raise(pool.tag)
+
+        full_w = n_cols * cw
+        full_h = n_rows * rh
+        self.h_scroll.set(*((self.x0 / full_w, min(1, (self.x0 + view_w) / full_w)) if full_w else (0, 1)))
+        self.v_scroll.set(*((self.y0 / full_h, min(1, (self.y0 + view_h) / full_h)) if full_h else (0, 1)))
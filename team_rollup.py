@@ -0,0 +1,178 @@
+# team_rollup.py
+"""Team roll-up: merges many users' session logs into per-user/project/day hours.
+
+    python team_rollup.py collected/ --from 2025-01-01 --to 2025-06-30 --out rollup.json --merged merged.csv
+
+Each path is a session log CSV, a user's data folder (sessionLog.csv or month/week
+partition files, plus projectCatalog.csv) or a folder of those. A log's user is its folder name for
+sessionLog.csv and partitions, otherwise the file name. Logs are streamed and
+heap-merged in start-time order, so memory stays at one day's rows per log however
+much history there is.
+"""
+import argparse
+import csv
+import heapq
+import json
+import itertools
+import os
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import config
+from catalog import ProjectCatalog
+from partitioned_storage import partition_span
+from storage import filter_rows
+
+TaggedRow = Tuple[str, str, str, float]  # (start, user, project, seconds)
+SKIPPED_FILES = {os.path.basename(config.CATALOG_FILE), os.path.basename(config.CONFIG_FILE)}
+
+
+def find_logs(path: str) -> List[Tuple[str, List[str]]]:
+    """(user, log files oldest first) for every log under path."""
+    if os.path.isfile(path):
+        name = os.path.splitext(os.path.basename(path))[0]
+        if name == "sessionLog":
+            name = os.path.basename(os.path.dirname(os.path.abspath(path)))
+        return [(name, [path])]
+
+    user = os.path.basename(os.path.abspath(path))
+    for folder in (path, os.path.join(path, "sessions")):
+        if not os.path.isdir(folder):
+            continue
+        spans = sorted((partition_span(name), name) for name in os.listdir(folder) if partition_span(name))
+        if spans:
+            return [(user, [os.path.join(folder, name) for _, name in spans])]
+    if os.path.isfile(os.path.join(path, "sessionLog.csv")):
+        return [(user, [os.path.join(path, "sessionLog.csv")])]
+
+    logs = []
+    for name in sorted(os.listdir(path)):
+        child = os.path.join(path, name)
+        if os.path.isdir(child) or (name.endswith(".csv") and name not in SKIPPED_FILES):
+            logs += find_logs(child)
+    return logs
+
+
+def user_catalog(paths: Sequence[str]) -> Optional[ProjectCatalog]:
+    # The user's project catalog, if it was collected along with the logs. Only a user's data folder
+    # has one (beside sessionLog.csv, or above the sessions folder of partitions); a loose CSV named
+    # after its user shares its folder with other users' logs, so no catalog there is taken as its own.
+    log = os.path.abspath(paths[0])
+    folder = os.path.dirname(log)
+    if partition_span(os.path.basename(log)):
+        if os.path.basename(folder) == os.path.basename(config.SESSION_DIR):
+            folder = os.path.dirname(folder)
+    elif os.path.basename(log) != "sessionLog.csv":
+        return None
+    candidate = os.path.join(folder, os.path.basename(config.CATALOG_FILE))
+    return ProjectCatalog.load(candidate, seed=list) if os.path.exists(candidate) else None
+
+
+def iter_user_rows(user: str, paths: Sequence[str], start_date: Optional[date] = None,
+                   end_date: Optional[date] = None) -> Iterator[TaggedRow]:
+    # One file open at a time, in start order. File order is only start order day by day:
+    # adjustments are stamped while a longer session is still running, and compaction appends each
+    # day's corrections after that day's later sessions. Rows never leave their own day, so each
+    # day is buffered and sorted on its own. Project IDs are resolved through the user's own
+    # catalog, as each user numbers their projects independently.
+    catalog = user_catalog(paths)
+    name = catalog.name if catalog else str
+
+    def rows():
+        for path in paths:
+            with open(path, newline="") as f:
+                reader = csv.reader(f)
+                next(reader, None)  # header
+                for project, start, duration in filter_rows(reader, start_date, end_date):
+                    if duration:
+                        yield start, user, name(project), float(duration)
+
+    for _, day in itertools.groupby(rows(), key=lambda row: row[0][:10]):
+        yield from sorted(day, key=lambda row: row[0])
+
+
+def merge_logs(logs: Iterable[Tuple[str, Sequence[str]]], start_date: Optional[date] = None,
+               end_date: Optional[date] = None) -> Iterator[TaggedRow]:
+    """Every row of every log, tagged with its user, in start-time order (k-way heap merge)."""
+    streams = [iter_user_rows(user, paths, start_date, end_date) for user, paths in logs]
+    return heapq.merge(*streams)
+
+
+class TeamRollup:
+    # Seconds per user, project, day and (user, project), built in one pass over the rows.
+    # Adjustment rows are summed like any other row, as View Summary does, so a moved hour
+    # lands on the project it was moved to.
+    def __init__(self):
+        self.rows = 0
+        self.per_user = defaultdict(float)
+        self.per_project = defaultdict(float)
+        self.per_day = defaultdict(float)
+        self.per_user_project = defaultdict(float)
+
+    def add(self, row: TaggedRow):
+        start, user, project, seconds = row
+        self.rows += 1
+        self.per_user[user] += seconds
+        self.per_project[project] += seconds
+        self.per_day[start[:10]] += seconds
+        self.per_user_project[user, project] += seconds
+
+    def consume(self, rows: Iterable[TaggedRow]) -> "TeamRollup":
+        for row in rows:
+            self.add(row)
+        return self
+
+    def as_hours(self) -> Dict:
+        def hours(totals):
+            return {key: round(seconds / 3600, 2) for key, seconds in sorted(totals.items())}
+
+        per_user_project = defaultdict(dict)
+        for (user, project), seconds in sorted(self.per_user_project.items()):
+            per_user_project[user][project] = round(seconds / 3600, 2)
+        return {
+            "rows": self.rows,
+            "per_user": hours(self.per_user),
+            "per_project": hours(self.per_project),
+            "per_day": hours(self.per_day),
+            "per_user_project": dict(per_user_project),
+        }
+
+
+def tee_csv(rows: Iterable[TaggedRow], path: str) -> Iterator[TaggedRow]:
+    # Passes rows through while writing them out as the merged, user-tagged log
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["User", "Project", "Start", "Duration"])
+        for row in rows:
+            start, user, project, seconds = row
+            writer.writerow([user, project, start, seconds])
+            yield row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="session logs or folders of them")
+    parser.add_argument("--from", dest="start_date", type=date.fromisoformat, help="first day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end_date", type=date.fromisoformat, help="last day (YYYY-MM-DD)")
+    parser.add_argument("--merged", help="also write the merged, user-tagged rows to this CSV")
+    parser.add_argument("--out", help="write the roll-up JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    logs = [log for path in args.paths for log in find_logs(path)]
+    rows = merge_logs(logs, args.start_date, args.end_date)
+    if args.merged:
+        rows = tee_csv(rows, args.merged)
+    report = TeamRollup().consume(rows).as_hours()
+    report["logs"] = len(logs)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
 # tracker.py
-from datetime import datetime
-from typing import List, Dict
+from datetime import datetime, date
+from typing import Callable, List, Dict, Optional, Tuple
 from models import Session
+from metrics import timed
 
 
 def finalize_sessions(sessions: List[Session]) -> List[Session]:
@@ -14,27 +15,44 @@ def finalize_sessions(sessions: List[Session]) -> List[Session]:
     return finalized
 
 
-def switch_project(sessions: List[Session], new_project: str) -> List[Session]:
+@timed("compute_totals", rows=lambda args, result: len(args[0]))
+def compute_totals(sessions: List[Session], resolve: Optional[Callable[[str], str]] = None) -> Dict[str, float]:
+    # resolve maps a session's project to the name to total it under (e.g. storage.project_name)
     now = datetime.now()
-
-    # Sanitize: drop any existing unfinalized sessions before switching
-    finalized_sessions = []
+    totals = {}
     for s in sessions:
-        if s.duration is None:
-            s.duration = (now - s.start_time).total_seconds()
-        finalized_sessions.append(s)
+        dur = s.duration if s.duration is not None else (now - s.start_time).total_seconds()
+        project = resolve(s.project) if resolve else s.project
+        totals[project] = totals.get(project, 0) + dur
+    return totals
 
-    # Append the new session
-    finalized_sessions.append(Session(new_project, now, None))
-    return finalized_sessions
 
+@timed("summary_pivot", rows=lambda args, result: len(args[0]))
+def summary_pivot(totals: Dict[Tuple[date, str], float]):
+    """Pivots {(date, project): seconds} into the View Summary table.
 
+    Returns (dates, projects, hours, total_all, total_no_break), where hours[i][j] is the
+    hours project i logged on dates[j], rounded to 2 places; both are sorted. The totals
+    add up the rounded cells, so they match the column above them.
+    """
+    dates = sorted({day for day, _ in totals})
+    projects = sorted({project for _, project in totals})
+    column = {day: j for j, day in enumerate(dates)}
+    row = {project: i for i, project in enumerate(projects)}
 
+    seconds = [[0.0] * len(dates) for _ in projects]
+    for (day, project), secs in totals.items():
+        seconds[row[project]][column[day]] += secs
+    return pivot_from_seconds(dates, projects, seconds)
 
-def compute_totals(sessions: List[Session]) -> Dict[str, float]:
-    now = datetime.now()
-    totals = {}
-    for s in sessions:
-        dur = s.duration if s.duration is not None else (now - s.start_time).total_seconds()
-        totals[s.project] = totals.get(s.project, 0) + dur
-    return totals
+
+def pivot_from_seconds(dates: List[date], projects: List[str], seconds: List[List[float]]):
+    # Rounds a seconds[project][date] grid into the summary_pivot result
+    hours = [[round(secs / 3600, 2) for secs in project_row] for project_row in seconds]
+
+    # === Totals ===
+    total_all = [round(sum(col), 2) for col in zip(*hours)]
+    no_break = [project_row for project, project_row in zip(projects, hours) if project != "Break"]
+    total_no_break = [round(sum(col), 2) for col in zip(*no_break)] if no_break else [0.0] * len(dates)
+
+    return dates, projects, hours, total_all, total_no_break
@@ -1,21 +1,44 @@
 # utils.py
-import os
+import atexit
 import logging
+import queue
 from datetime import timedelta
-from config import DEBUG_LOG_FILE
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+import config
 
 
-# Configure the debug logger
-logging.basicConfig(
-    filename=DEBUG_LOG_FILE,
-    level=logging.INFO,
-    format="%(asctime)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S"
-)
+# Debug logging: callers only enqueue records, a listener thread does the file I/O and rotation.
+# Handlers are attached on the first enabled message, so importing utils does no I/O.
+logger = logging.getLogger("timesheet")
+logger.setLevel(config.DEBUG_LOG_LEVEL)
+logger.propagate = False
+_listener = None
 
 
-def log_debug_event(msg: str):
-    logging.info(msg)
+def _start_logging():
+    global _listener
+    if config.DEBUG_LOG_ROTATION == "time":
+        handler = TimedRotatingFileHandler(config.DEBUG_LOG_FILE, when=config.DEBUG_LOG_ROTATE_WHEN,
+                                           backupCount=config.DEBUG_LOG_BACKUPS, delay=True)
+    else:
+        handler = RotatingFileHandler(config.DEBUG_LOG_FILE, maxBytes=config.DEBUG_LOG_MAX_BYTES,
+                                      backupCount=config.DEBUG_LOG_BACKUPS, delay=True)
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"))
+
+    records = queue.SimpleQueue()
+    _listener = QueueListener(records, handler)
+    _listener.start()
+    atexit.register(_listener.stop)  # drains whatever is still queued
+    logger.addHandler(QueueHandler(records))
+
+
+def log_debug_event(msg: str, *args, level: int = logging.INFO):
+    """Logs msg (%-formatted with args, only if the level is enabled)."""
+    if not logger.isEnabledFor(level):
+        return
+    if _listener is None:
+        _start_logging()
+    logger.log(level, msg, *args)
 
 
 def format_seconds(seconds: float) -> str: